@@ -0,0 +1,107 @@
+import numpy as np
+from functools import lru_cache
+from scipy.interpolate import CubicHermiteSpline
+
+def monotone_hermite(x:np.ndarray, y:np.ndarray, slopes:np.ndarray) -> CubicHermiteSpline:
+    """
+    Cubic Hermite interpolation of increasing y with the given slopes, limited so the curve can't decrease
+    between the points (Fritsch-Carlson: every slope at most 3 times the secant of the intervals next to it).
+
+    Args:
+        x, y - The points (both increasing).
+        slopes - The slopes at the points (they can be infinite).
+
+    Returns the interpolating function.
+    """
+    secants = np.diff(y) / np.diff(x)
+    limit = 3 * np.minimum(np.concatenate([secants[:1], secants]), np.concatenate([secants, secants[-1:]]))
+    return CubicHermiteSpline(x, y, np.clip(slopes, 0.0, limit))
+
+class CDFTable:
+    """
+    Tabulated cumulative distribution function of any density, integrated once on an adaptive grid.
+    The grid is refined where the density changes the fastest, the integral over each grid interval is found with
+    Simpson's rule, and the CDF and inverse CDF between grid points use monotone cubic interpolation with the density as the slope.
+    Infinite ranges are handled by tabulating in t = arctan(x) instead of x.
+    """
+    def __init__(self, density, low:float, high:float, tol:float = 1e-10, max_points:int = 100000):
+        """
+        Args:
+            density - The density, e.g. f (it must accept numpy arrays, and doesn't have to be normalized).
+            low, high - The range (either can be infinite).
+            tol - The allowed error of the integral, relative to the whole integral.
+            max_points - The largest number of grid points.
+        """
+        self.low, self.high = low, high
+        self.transformed = np.isinf(low) or np.isinf(high)
+        t_low, t_high = self.to_t(np.array([low, high], dtype=float))
+
+        def g(t):
+            """The density in terms of t (with the dx/dt = 1/cos(t)^2 factor for the arctan transformation)."""
+            if not self.transformed:
+                return density(t)
+            with np.errstate(all="ignore"):
+                values = density(np.tan(t)) / np.cos(t)**2
+            return np.nan_to_num(values, nan=0.0, posinf=0.0)
+
+        # Refine the intervals where Simpson's rule over the whole interval and over its two halves disagree
+        t = np.linspace(t_low, t_high, 33)
+        while True:
+            h = np.diff(t)
+            nodes = t[:-1, None] + h[:, None] * np.linspace(0, 1, 5) # Quarter points of every interval
+            g_nodes = g(nodes)
+            whole = h / 6 * (g_nodes[:, 0] + 4 * g_nodes[:, 2] + g_nodes[:, 4])
+            halves = h / 12 * (g_nodes[:, 0] + 4 * g_nodes[:, 1] + 2 * g_nodes[:, 2] + 4 * g_nodes[:, 3] + g_nodes[:, 4])
+            simpson = halves + (halves - whole) / 15 # Richardson extrapolation
+            total = simpson.sum()
+            refine = np.abs(halves - whole) / 15 > tol * abs(total) * h / (t_high - t_low)
+            refine &= h > 1e-12 * (t_high - t_low) # Stop at jumps of the density
+            if not refine.any() or len(t) + refine.sum() > max_points:
+                break
+            t = np.sort(np.concatenate([t, t[:-1][refine] + h[refine] / 2]))
+
+        self.total = total # Integral of the density over the range (the normalization constant)
+        self.t = t
+        self.cdf_values = np.concatenate([[0.0], np.cumsum(simpson)]) / total
+        self.cdf_values[-1] = 1.0
+        # The slope of the CDF is the normalized density, and the slope of the inverse is one over it
+        pdf_values = np.maximum(g(t), 0.0) / total
+        self.forward = monotone_hermite(self.t, self.cdf_values, pdf_values)
+        # The inverse needs strictly increasing CDF values (a density of zero gives repeated values)
+        keep = np.concatenate([[True], np.diff(self.cdf_values) > 0])
+        with np.errstate(divide="ignore"):
+            self.backward = monotone_hermite(self.cdf_values[keep], self.t[keep], 1 / pdf_values[keep])
+
+    def to_t(self, x:np.ndarray) -> np.ndarray:
+        """
+        Returns the grid coordinate t of x.
+        """
+        return np.arctan(x) if self.transformed else x
+
+    def cdf(self, x) -> np.ndarray:
+        """
+        Returns the value of the CDF at x (an array or a single number).
+        """
+        t = np.clip(self.to_t(np.asarray(x, dtype=float)), self.t[0], self.t[-1])
+        return np.clip(self.forward(t), 0.0, 1.0)
+
+    def inverse(self, u) -> np.ndarray:
+        """
+        Returns the value of the inverse CDF at u in [0, 1] (an array or a single number).
+        """
+        t = self.backward(np.clip(np.asarray(u, dtype=float), 0.0, 1.0))
+        return np.tan(t) if self.transformed else t
+
+    def sample(self, n:int, rng:np.random.Generator) -> np.ndarray:
+        """
+        Returns n random numbers distributed according to the density (inversion method).
+        """
+        return self.inverse(rng.random(n))
+
+@lru_cache(maxsize=None)
+def tabulate(density, low:float, high:float, tol:float = 1e-10, max_points:int = 100000) -> CDFTable:
+    """
+    Returns the CDFTable of density between low and high, building it only the first time
+    it is asked for (per density, range and tolerance).
+    """
+    return CDFTable(density, low, high, tol, max_points)
@@ -0,0 +1,94 @@
+import numpy as np
+import argparse
+import hashlib
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from histogram import Histogram
+from samplers import sample_analytical, sample_combined, sample_adaptive
+
+# Batch samplers that can be picked by name
+SAMPLERS = {
+    "analytical": sample_analytical,
+    "combined": sample_combined,
+    "adaptive": sample_adaptive
+}
+
+def chunk_sizes(n:int, chunk_size:int) -> list:
+    """
+    Splits n samples into chunks of chunk_size (the last one takes the rest).
+    """
+    return [min(chunk_size, n - start) for start in range(0, n, chunk_size)]
+
+def generate_chunk(method:str, size:int, seed:np.random.SeedSequence) -> np.ndarray:
+    """
+    Generates one chunk of random numbers with its own random generator.
+
+    Args:
+        method - The name of the sampler (see SAMPLERS).
+        size - The number of random numbers.
+        seed - The seed sequence of the chunk.
+
+    Returns the random numbers.
+    """
+    return SAMPLERS[method](size, np.random.default_rng(seed))[0]
+
+def generate_chunks(n:int, method:str = "analytical", chunk_size:int = 1000000, seed:int = 5, workers:int = 1):
+    """
+    Generates n random numbers a chunk at a time, in order. Chunk k always gets the k-th seed spawned from
+    seed, so the random numbers are the same for any number of workers.
+
+    Args:
+        n - The number of random numbers.
+        method - The name of the sampler (see SAMPLERS).
+        chunk_size - The number of random numbers per chunk.
+        seed - The master seed.
+        workers - The number of processes (1 to generate everything in this process).
+
+    Yields the chunks (numpy arrays).
+    """
+    sizes = chunk_sizes(n, chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    if workers == 1:
+        for size, chunk_seed in zip(sizes, seeds):
+            yield generate_chunk(method, size, chunk_seed)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Only a few chunks per worker are in flight at once, so the chunks don't pile up in memory
+        pending = deque()
+        for size, chunk_seed in zip(sizes, seeds):
+            pending.append(pool.submit(generate_chunk, method, size, chunk_seed))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def stream(n:int, consumers:list, method:str = "analytical", chunk_size:int = 1000000, seed:int = 5,
+           workers:int = 1) -> None:
+    """
+    Generates n random numbers with generate_chunks and hands every chunk to each consumer
+    (a function that takes an array, e.g. the add method of a Histogram).
+    """
+    for chunk in generate_chunks(n, method, chunk_size, seed, workers):
+        for consume in consumers:
+            consume(chunk)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate random numbers in parallel chunks and histogram them as they come in.")
+    parser.add_argument("--samples", type=int, default=10000000, help="number of random numbers")
+    parser.add_argument("--method", choices=list(SAMPLERS), default="analytical", help="sampler")
+    parser.add_argument("--chunk-size", type=int, default=1000000, help="random numbers per chunk")
+    parser.add_argument("--seed", type=int, default=5, help="master seed")
+    parser.add_argument("--workers", type=int, default=1, help="number of processes")
+    parser.add_argument("--output", help="save the histogram to this .npz file")
+    args = parser.parse_args()
+
+    hist = Histogram(-10, 10, 100)
+    start = time.perf_counter()
+    stream(args.samples, [hist.add], args.method, args.chunk_size, args.seed, args.workers)
+    elapsed = time.perf_counter() - start
+    print(f"{args.samples:,} random numbers ({args.method}) in {elapsed:.1f} s, {args.samples / elapsed:,.0f} samples/sec with {args.workers} worker(s)")
+    print(f"Underflow {hist.underflow}, overflow {hist.overflow}, histogram checksum {hashlib.sha256(hist.counts.tobytes()).hexdigest()[:16]}")
+    if args.output:
+        np.savez_compressed(args.output, edges=hist.edges(), counts=hist.counts, underflow=hist.underflow, overflow=hist.overflow)
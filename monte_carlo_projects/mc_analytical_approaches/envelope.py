@@ -0,0 +1,129 @@
+import numpy as np
+
+class AdaptiveEnvelope:
+    """
+    Rejection sampler for any density on a finite range, with a piecewise constant envelope built automatically.
+    The range starts out split into a few pieces, each with the largest value of the density on it as its height.
+    After every block of proposals, the pieces with the most rejections are split in half, so the envelope
+    tightens around the density where it wastes the most proposals (and nothing has to be tuned by hand,
+    unlike A and s for the Gaussian envelope).
+    """
+    def __init__(self, density, low:float, high:float, num_pieces:int = 16, max_pieces:int = 256,
+                 probes:int = 9, margin:float = 0.01):
+        """
+        Args:
+            density - The target density, e.g. f (it must accept numpy arrays, and doesn't have to be normalized).
+            low, high - The range (both finite).
+            num_pieces - The number of pieces to start with.
+            max_pieces - The largest number of pieces.
+            probes - The number of points per piece the density is evaluated at to find its largest value.
+            margin - How much (relative) the height of each piece is raised above the largest value found.
+        """
+        self.density = density
+        self.low, self.high = low, high
+        self.max_pieces = max_pieces
+        self.probes = probes
+        self.margin = margin
+        self.edges = np.linspace(low, high, num_pieces + 1)
+        self.heights = self.piece_height(self.edges[:-1], self.edges[1:])
+        self.violations = 0 # Proposals where the density was above the envelope (the height is raised for these)
+
+    def piece_height(self, left:np.ndarray, right:np.ndarray) -> np.ndarray:
+        """
+        Returns the envelope height of the pieces from left to right (the largest value of the density
+        at the probe points, plus the margin).
+        """
+        points = left[:, None] + (right - left)[:, None] * np.linspace(0, 1, self.probes)
+        return self.density(points).max(axis=1) * (1 + self.margin)
+
+    def split(self, pieces:np.ndarray) -> None:
+        """
+        Splits the given pieces (sorted indices) in half.
+        """
+        left, right = self.edges[pieces], self.edges[pieces + 1]
+        mid = (left + right) / 2
+        heights = np.insert(self.heights, pieces + 1, self.piece_height(mid, right))
+        heights[pieces + np.arange(len(pieces))] = self.piece_height(left, mid)
+        self.edges = np.insert(self.edges, pieces + 1, mid)
+        self.heights = heights
+
+    def area(self) -> float:
+        """
+        Returns the area under the envelope.
+        """
+        return float(np.sum(self.heights * np.diff(self.edges)))
+
+    def efficiency(self) -> float:
+        """
+        Returns the area under the density divided by the area under the envelope
+        (the acceptance rate the envelope gives from now on).
+        """
+        from cdf_table import tabulate
+        return float(tabulate(self.density, float(self.low), float(self.high)).total / self.area())
+
+    def propose(self, n:int, rng:np.random.Generator) -> tuple:
+        """
+        Draws n points uniformly from under the envelope.
+
+        Returns the x values, the y values and the pieces the points are in.
+        """
+        cumulative = np.cumsum(self.heights * np.diff(self.edges))
+        u = rng.random(n) * cumulative[-1]
+        pieces = np.minimum(np.searchsorted(cumulative, u, side="right"), len(self.heights) - 1)
+        # Where u falls inside the area of its piece is also where x falls inside the piece
+        before = cumulative[pieces] - self.heights[pieces] * np.diff(self.edges)[pieces]
+        x = np.clip(self.edges[pieces] + (u - before) / self.heights[pieces], self.edges[pieces], self.edges[pieces + 1])
+        y = rng.random(n) * self.heights[pieces]
+        return x, y, pieces
+
+    def sample(self, n:int, rng:np.random.Generator, block_size:int = None) -> tuple:
+        """
+        Generates n random numbers with the rejection method, a block of proposals at a time,
+        tightening the envelope after every block.
+
+        Args:
+            n - The number of random numbers.
+            rng - The random generator.
+            block_size - The number of proposals per block (by default, up to 1024 while the envelope can
+                         still be split, then enough to fill the rest in about one block).
+
+        Returns the random numbers and a dict of statistics.
+        """
+        samples = np.empty(n)
+        filled = proposals = 0
+        rate = self.efficiency()
+        while filled < n:
+            size = block_size or int((n - filled) / rate * 1.1) + 64
+            if not block_size and len(self.heights) < self.max_pieces:
+                size = min(size, 1024)
+            x, y, pieces = self.propose(size, rng)
+            fx = self.density(x)
+            over = fx > self.heights[pieces]
+            if over.any():
+                # The probes missed a peak, so raise the pieces it is in and draw the block again
+                np.maximum.at(self.heights, pieces[over], fx[over] * (1 + self.margin))
+                self.violations += int(over.sum())
+                continue
+            hits = np.flatnonzero(y < fx)
+            take = min(len(hits), n - filled)
+            samples[filled:filled + take] = x[hits[:take]]
+            filled += take
+            # Proposals after the last one kept don't count (they were only drawn because of the oversampling)
+            used = size if take == len(hits) else int(hits[take - 1]) + 1
+            proposals += used
+            rate = max(filled / proposals, 0.01)
+
+            # Split the pieces with the most rejections, as many as there is room for
+            room = self.max_pieces - len(self.heights)
+            if room > 0:
+                misses = np.bincount(pieces[:used][y[:used] >= fx[:used]], minlength=len(self.heights))
+                worst = np.argsort(misses, kind="stable")[::-1][:room]
+                self.split(np.sort(worst[misses[worst] > 0]))
+        return samples, {
+            "proposals": proposals,
+            "accepted": filled,
+            "acceptance_rate": filled / proposals if proposals else float("nan"),
+            "pieces": len(self.heights),
+            "envelope_efficiency": self.efficiency(),
+            "violations": self.violations
+        }
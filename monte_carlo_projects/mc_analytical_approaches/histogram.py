@@ -0,0 +1,64 @@
+import numpy as np
+
+class Histogram:
+    """
+    Histogram with num_bins equal bins between low and high, filled a chunk of samples at a time with np.bincount.
+    Samples below low and from high up are counted as underflow and overflow (NaNs are skipped), and histograms
+    with the same bins can be merged exactly, so the samples never have to be in memory all at once.
+    """
+    def __init__(self, low:float, high:float, num_bins:int):
+        """
+        Args:
+            low, high - The lower edge of the first bin and the upper edge of the last bin.
+            num_bins - The number of bins.
+        """
+        self.low, self.high = low, high
+        self.width = (high - low) / num_bins
+        self.counts = np.zeros(num_bins, dtype=np.int64)
+        self.underflow = 0
+        self.overflow = 0
+
+    def add(self, x) -> None:
+        """
+        Adds a chunk of samples (an array or a single number).
+        """
+        index = np.floor((np.ravel(x) - self.low) / self.width)
+        inside = (index >= 0) & (index < len(self.counts))
+        self.underflow += int(np.count_nonzero(index < 0))
+        self.overflow += int(np.count_nonzero(index >= len(self.counts)))
+        self.counts += np.bincount(index[inside].astype(np.int64), minlength=len(self.counts))
+
+    def merge(self, other) -> None:
+        """
+        Adds the counts of another Histogram with the same bins (e.g. from another chunk or process).
+        """
+        if (other.low, other.high, len(other.counts)) != (self.low, self.high, len(self.counts)):
+            raise ValueError("Only histograms with the same bins can be merged.")
+        self.counts += other.counts
+        self.underflow += other.underflow
+        self.overflow += other.overflow
+
+    def total(self) -> int:
+        """
+        Returns the number of samples added (underflow and overflow included).
+        """
+        return int(self.counts.sum()) + self.underflow + self.overflow
+
+    def edges(self) -> np.ndarray:
+        """
+        Returns the bin edges.
+        """
+        return self.low + self.width * np.arange(len(self.counts) + 1)
+
+    def centers(self) -> np.ndarray:
+        """
+        Returns the bin centers.
+        """
+        return self.low + self.width * (np.arange(len(self.counts)) + 0.5)
+
+    def density(self) -> np.ndarray:
+        """
+        Returns the probability density in each bin (counts / bin width / total, underflow and overflow included in the total).
+        """
+        total = self.total()
+        return self.counts / self.width / total if total else np.zeros(len(self.counts))
@@ -1,10 +1,9 @@
 import numpy as np
 import math
-from scipy.integrate import quad
-import matplotlib.pyplot as plt
-
-# Initializing a seed for reproducability
-np.random.seed(5)
+import argparse
+import json
+import os
+from histogram import Histogram
 
 # Setting the global parameters
 A = 14.1
@@ -53,17 +52,14 @@ def cumulative_distribution_function(x:float) -> float:
     Defines the cumulative distribution function (CDF) of the Lorentz distribution.
 
     Args:
-        x - The input to the function.
+        x - The input to the function (a number or an array).
 
     Returns the value of the CDF at x.
     """
-    # Calculates the normalization constant for the Lorentz distribution
-    norm_const, _ = quad(lambda x: f(x), -np.inf, np.inf)
-    # print(f"Norm const.: {norm_const}") # To see normalization constant value
+    from cdf_table import tabulate
 
-    # Integrates f(x) with respect to x
-    integral, _ = quad(lambda x: f(x), -np.inf, x)
-    return integral / norm_const
+    # The table (normalization constant included) is integrated once and reused by every later call
+    return tabulate(f, -np.inf, np.inf).cdf(x)
 
 def inverse_cumulative_F(x:float) -> float:
     """
@@ -79,16 +75,22 @@ def inverse_cumulative_F(x:float) -> float:
     return 2 * math.tan(x * (arctan_hi - arctan_lo) + arctan_lo)
 
 # Function to generate random numbers and collect them for analysis
-def generate_random_numbers() -> tuple:
+def generate_random_numbers(num_samples:int = 100000, seed:int = 5, verbose:bool = True) -> tuple:
     """
     Generates random numbers using the analytical method and the combined analytical-rejection method.
 
+    Args:
+        num_samples - The number of random numbers per method.
+        seed - The seed for np.random (for reproducability).
+        verbose - Whether to print the progress.
+
     Returns two numpy arrays containing the generated random numbers.
     """
+    np.random.seed(seed)
     analytical_x = []
     combined_x = []
 
-    for i in range(1, 100001):
+    for i in range(1, num_samples + 1):
         
         # Inversion method
         u = np.random.random()
@@ -103,7 +105,7 @@ def generate_random_numbers() -> tuple:
                 combined_x.append(x_2)
                 break
 
-        if i % 10000 == 0:
+        if verbose and i % 10000 == 0:
             print(f"Generated {i} random numbers.. {x_1},    {x_2}")
 
     return np.array(analytical_x), np.array(combined_x)
@@ -116,25 +118,19 @@ def plot_histograms(analytical_x, combined_x) -> None:
         analytical_x (np.array) - The random numbers generated by the analytical method.
         combined_x (np.array) - The random numbers generated by the combined method.
     """
+    import matplotlib.pyplot as plt
     # Parameters
     num_bins = 100
     start = -11
     width = 22.0 / num_bins
 
-    # Arrays to store histogram values
-    bin_analytical = np.zeros(num_bins)
-    bin_combined = np.zeros(num_bins)
-
-    # Fill both histograms
-    for x in analytical_x:
-        ind = int((x - start) / width + 0.5)
-        if ind >= 0 and ind < num_bins:
-            bin_analytical[ind] += 1
-
-    for x in combined_x:
-        ind = int((x - start) / width + 0.5)
-        if ind >= 0 and ind < num_bins:
-            bin_combined[ind] += 1
+    # Fill both histograms (bin i is centered at start + i * width)
+    hist_analytical = Histogram(start - width / 2, start + (num_bins - 0.5) * width, num_bins)
+    hist_combined = Histogram(start - width / 2, start + (num_bins - 0.5) * width, num_bins)
+    hist_analytical.add(analytical_x)
+    hist_combined.add(combined_x)
+    bin_analytical = hist_analytical.counts
+    bin_combined = hist_combined.counts
 
     # Normalize histogram values
     a_max = np.max(bin_analytical)
@@ -156,14 +152,14 @@ def plot_histograms(analytical_x, combined_x) -> None:
     plt.title('Method Comparison')
     plt.legend()
     plt.grid(True)
-    plt.show()
 
 def plot_cumulative_distribution_function() -> None:
     """
     Plots the cumulative distribution function of the Lorentz distribution.
     """
+    import matplotlib.pyplot as plt
     x_values = np.linspace(-10, 10, 1000)
-    y_values = [cumulative_distribution_function(x) for x in x_values]
+    y_values = cumulative_distribution_function(x_values)
 
     plt.figure(figsize=(10, 6))
     plt.plot(x_values, y_values, label='CDF')
@@ -172,12 +168,12 @@ def plot_cumulative_distribution_function() -> None:
     plt.title('Cumulative Distribution Function')
     plt.legend()
     plt.grid(True)
-    plt.show()
-    
+
 def plot_hits_and_misses() -> None:
     """
     Plots the regions where the combined method hits and misses the target distribution.
     """
+    import matplotlib.pyplot as plt
     x_values = np.linspace(-20, 20, 1000)
     f_values = f(x_values)
     g_values = A * gaussian(x_values, 0, s)
@@ -196,13 +192,7 @@ def plot_hits_and_misses() -> None:
     
     plt.xticks([])
     plt.yticks([])
-    
-    plt.show()
-    
-    
-    
-    
-    
+
 def g_square(x):
     """
     Defines a square function larger than all of f(x).
@@ -215,6 +205,7 @@ def plot_old_hm():
     """
     Shows what the "old" hit-and-miss method might look like.
     """
+    import matplotlib.pyplot as plt
     x_values = np.linspace(-20, 20, 1000)
     f_values = f(x_values)
     g_values = A * gaussian(x_values, 0, s)
@@ -234,21 +225,82 @@ def plot_old_hm():
     plt.xticks([])
     plt.yticks([])
 
-    plt.show()
+def summarize(analytical_x, combined_x) -> dict:
+    """
+    Summarizes the generated random numbers.
 
+    Args:
+        analytical_x (np.array) - The random numbers generated by the analytical method.
+        combined_x (np.array) - The random numbers generated by the combined method.
 
-if __name__ == "__main__":
-    # Prints out generated random number values for analytical method & combined method
-    analytical_x, combined_x = generate_random_numbers()
+    Returns the mean, standard deviation and quartiles of each method, and the largest distance between its
+    empirical CDF and the CDF of f(x) on (-10, 10) (the Kolmogorov-Smirnov statistic).
+    """
+    from cdf_table import tabulate
+    table = tabulate(f, -10.0, 10.0)
+    results = {}
+    for name, x in (("analytical", analytical_x), ("combined", combined_x)):
+        x = np.sort(x)
+        cdf = table.cdf(x)
+        ks = max(np.max(np.arange(1, len(x) + 1) / len(x) - cdf), np.max(cdf - np.arange(len(x)) / len(x)))
+        results[name] = {
+            "samples": len(x),
+            "mean": float(np.mean(x)),
+            "std": float(np.std(x)),
+            "quartiles": [float(q) for q in np.percentile(x, [25, 50, 75])],
+            "ks_statistic": float(ks)
+        }
+    return results
+
+# Figures that can be picked by name
+PLOTS = ["histograms", "cdf", "hits", "old_hm"]
+
+def main(argv=None) -> dict:
+    """
+    Runs the comparison from the command line. Without options, it prints the progress and shows all four
+    figures like before (the histograms, the CDF, the hits and misses and the "old" hit-and-miss method);
+    with --output-dir, the figures are saved there instead (nothing opens a window), and --json writes the numeric results.
 
-    # Plot histograms and makes comparisons
-    plot_histograms(analytical_x, combined_x)
+    Returns the numeric results.
+    """
+    parser = argparse.ArgumentParser(description="Compare the inversion and combined analytical-rejection methods for the Lorentz distribution.")
+    parser.add_argument("--samples", type=int, default=100000, help="random numbers per method")
+    parser.add_argument("--seed", type=int, default=5, help="seed for np.random")
+    parser.add_argument("--plots", nargs="*", choices=PLOTS, default=PLOTS, help="figures to make (all of them by default, none with an empty list)")
+    parser.add_argument("--output-dir", help="save the figures as PNG files in this directory instead of showing them")
+    parser.add_argument("--json", help="write the numeric results to this file (- for stdout)")
+    parser.add_argument("--quiet", action="store_true", help="don't print the progress")
+    args = parser.parse_args(argv)
 
-    # Plot cumulative distribution function
-    plot_cumulative_distribution_function()
-    
-    # Plot hits and misses
-    plot_hits_and_misses()
-    
-    # Plot "old" hit-and-miss method
-    plot_old_hm()
\ No newline at end of file
+    # Prints out generated random number values for analytical method & combined method
+    analytical_x, combined_x = generate_random_numbers(args.samples, args.seed, not args.quiet)
+    results = summarize(analytical_x, combined_x)
+
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+    for name in args.plots:
+        if name == "histograms":
+            plot_histograms(analytical_x, combined_x) # Plot histograms and makes comparisons
+        elif name == "cdf":
+            plot_cumulative_distribution_function()
+        elif name == "hits":
+            plot_hits_and_misses()
+        else:
+            plot_old_hm()
+
+        import matplotlib.pyplot as plt
+        if args.output_dir:
+            plt.savefig(os.path.join(args.output_dir, f"{name}.png"))
+            plt.close()
+        else:
+            plt.show()
+
+    if args.json == "-":
+        print(json.dumps(results, indent=2))
+    elif args.json:
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=2)
+    return results
+
+if __name__ == "__main__":
+    main()
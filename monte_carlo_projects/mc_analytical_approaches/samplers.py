@@ -0,0 +1,161 @@
+import numpy as np
+import argparse
+import time
+from main import A, s, f, gaussian, inverse_cumulative_F, generate_gaussian
+from envelope import AdaptiveEnvelope
+
+# Range of the samples, the same as in inverse_cumulative_F and generate_gaussian
+LOW, HIGH = -10, 10
+
+def inverse_cumulative_F_batch(u:np.ndarray) -> np.ndarray:
+    """
+    Vectorized version of inverse_cumulative_F.
+
+    Args: u - Array of uniformly distributed numbers in [0, 1].
+
+    Returns the values of the inverse CDF at u.
+    """
+    arctan_lo = np.arctan(LOW / 2)
+    arctan_hi = np.arctan(HIGH / 2)
+    return 2 * np.tan(u * (arctan_hi - arctan_lo) + arctan_lo)
+
+def sample_analytical(n:int, rng:np.random.Generator) -> tuple:
+    """
+    Generates n random numbers with the inversion method, all at once.
+
+    Args:
+        n - The number of random numbers.
+        rng - The random generator.
+
+    Returns the random numbers and a dict of statistics (every uniform number is accepted).
+    """
+    x = inverse_cumulative_F_batch(rng.random(n))
+    return x, {"proposals": n, "accepted": n, "acceptance_rate": 1.0}
+
+def sample_combined(n:int, rng:np.random.Generator, block_size:int = None) -> tuple:
+    """
+    Generates n random numbers with the combined analytical-rejection method, a block of proposals at a time.
+    Like the scalar path, the Gaussian proposals are cut to (-10, 10) and a proposal x is a hit if
+    y < f(x) for y uniform in (0, A * gaussian(x)), so the distribution is the same.
+
+    Args:
+        n - The number of random numbers.
+        rng - The random generator.
+        block_size - The number of proposals per block (by default, enough to fill the rest in about one block).
+
+    Returns the random numbers and a dict of statistics.
+    """
+    samples = np.empty(n)
+    filled = 0
+    normals = proposals = 0
+    rate = 0.4 # First guess at the acceptance rate, replaced by the measured one after the first block
+    while filled < n:
+        size = block_size or int((n - filled) / rate * 1.1) + 64 # Oversample a little, so one block is usually enough
+        x = rng.normal(0, s, size)
+        normals += size
+        x = x[(LOW < x) & (x < HIGH)] # Same as the loop in generate_gaussian
+        y = rng.random(len(x)) * A * gaussian(x, 0, s)
+        hits = np.flatnonzero(y < f(x))
+        # Keep the accepted ones (in order) until n are filled
+        take = min(len(hits), n - filled)
+        samples[filled:filled + take] = x[hits[:take]]
+        filled += take
+        # Proposals after the last one kept don't count (they were only drawn because of the oversampling)
+        proposals += len(x) if take == len(hits) else int(hits[take - 1]) + 1
+        rate = max(filled / proposals, 0.01) if proposals else rate
+    return samples, {
+        "proposals": proposals,
+        "normals": normals,
+        "accepted": filled,
+        "acceptance_rate": filled / proposals if proposals else float("nan")
+    }
+
+def sample_adaptive(n:int, rng:np.random.Generator) -> tuple:
+    """
+    Generates n random numbers with the rejection method, using an envelope for f built from scratch
+    (see envelope.py) instead of the hand-tuned Gaussian.
+
+    Args:
+        n - The number of random numbers.
+        rng - The random generator.
+
+    Returns the random numbers and a dict of statistics.
+    """
+    return AdaptiveEnvelope(f, LOW, HIGH).sample(n, rng)
+
+def sample_scalar_analytical(n:int) -> tuple:
+    """
+    Generates n random numbers with the inversion method the original way, one at a time (with the global np.random).
+
+    Returns the random numbers and a dict of statistics.
+    """
+    x = np.array([inverse_cumulative_F(np.random.random()) for _ in range(n)])
+    return x, {"proposals": n, "accepted": n, "acceptance_rate": 1.0}
+
+def sample_scalar_combined(n:int) -> tuple:
+    """
+    Generates n random numbers with the combined method the original way, one at a time (with the global np.random).
+
+    Returns the random numbers and a dict of statistics.
+    """
+    samples = np.empty(n)
+    proposals = 0
+    for i in range(n):
+        while True:
+            x = generate_gaussian(0, s)
+            proposals += 1
+            y = np.random.random() * A * gaussian(x, 0, s)
+            if y < f(x):
+                samples[i] = x
+                break
+    return samples, {"proposals": proposals, "accepted": n, "acceptance_rate": n / proposals}
+
+def benchmark(n:int, seed:int = 5, scalar_n:int = 0) -> dict:
+    """
+    Times the batch samplers (and the scalar path, if scalar_n > 0).
+
+    Args:
+        n - The number of random numbers per batch method.
+        seed - The seed of the random generator.
+        scalar_n - The number of random numbers for the scalar path (0 to skip it).
+
+    Returns the acceptance rate and samples/sec of each method (building the adaptive envelope is part of its time), and (with the scalar path) the
+    two-sample Kolmogorov-Smirnov p-values comparing the batch and scalar distributions.
+    """
+    # The table of f that AdaptiveEnvelope.efficiency uses is built (and scipy imported) before the clock starts
+    from cdf_table import tabulate
+    tabulate(f, float(LOW), float(HIGH))
+
+    rng = np.random.default_rng(seed)
+    results = {}
+    batch = {}
+    for name, sampler in (("analytical", sample_analytical), ("combined", sample_combined), ("adaptive", sample_adaptive)):
+        start = time.perf_counter()
+        batch[name], stats = sampler(n, rng)
+        stats["samples_per_second"] = n / (time.perf_counter() - start)
+        results[f"batch_{name}"] = stats
+
+    if scalar_n:
+        from scipy.stats import ks_2samp
+        np.random.seed(seed)
+        for name, sampler in (("analytical", sample_scalar_analytical), ("combined", sample_scalar_combined)):
+            start = time.perf_counter()
+            x, stats = sampler(scalar_n)
+            stats["samples_per_second"] = scalar_n / (time.perf_counter() - start)
+            stats["ks_pvalue_against_batch"] = ks_2samp(x, batch[name]).pvalue
+            results[f"scalar_{name}"] = stats
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the batch samplers for the inversion, combined and adaptive rejection methods.")
+    parser.add_argument("--samples", type=int, default=1000000, help="number of random numbers per method")
+    parser.add_argument("--seed", type=int, default=5, help="seed for the random generator")
+    parser.add_argument("--compare-scalar", type=int, default=0, metavar="N",
+                        help="also run the scalar path for N random numbers and compare the distributions")
+    args = parser.parse_args()
+
+    for method, stats in benchmark(args.samples, args.seed, args.compare_scalar).items():
+        line = f"{method:<18} acceptance rate {stats['acceptance_rate']:.3f}, {stats['samples_per_second']:>12,.0f} samples/sec"
+        if "ks_pvalue_against_batch" in stats:
+            line += f", KS p-value against batch {stats['ks_pvalue_against_batch']:.3f}"
+        print(line)
@@ -1,6 +1,10 @@
 import numpy as np 
-from random import random, choice
+import argparse
+import os
+import time
+from random import random, choice, Random
 import matplotlib.pyplot as plt
+from sandpile2d import LogHistogram, ensemble, save_histograms
 
 def initialize_grid(num_sites:int):
     """
@@ -8,41 +12,84 @@ def initialize_grid(num_sites:int):
     """
     return np.zeros(num_sites+2) # Grid of length, L
     
-def add_grain(grid:list) -> None:
+def add_grain(grid:list, verbose:bool = True) -> int:
     """
     Step 1: Add a grain to the middle site of the grid.
+    Returns the site the grain was added to.
     """
-    grid[len(grid)//2] += 1 # Choose the middle of the grid
-    print(f"Added grain to site {site}")
+    site = len(grid)//2 # Choose the middle of the grid
+    grid[site] += 1
+    if verbose:
+        print(f"Added grain to site {site}")
+    return site
     
-def drop_grains(grid, num_sites:int) -> None:
+def drop_grains(grid, num_sites:int, verbose:bool = True, choose = choice) -> int:
     """
     Modification to Step 1: Drop grains randomly across the grid interval.
+    Returns the site the grain was added to.
     """
-    site = choice(range(1, num_sites))  # Choose a random site 
+    site = choose(range(1, num_sites))  # Choose a random site 
     grid[site] += 1
-    print(f"Added grain to site {site}")
+    if verbose:
+        print(f"Added grain to site {site}")
+    return site
 
-def topple(grid, num_sites:int) -> None:
+def topple(grid, num_sites:int, verbose:bool = True, choose = choice) -> int:
     """
     Step 2 - 4: Mark sites for toppling if h(i) - h(i + 1) > 2 and topple them to the left or right.
+    With verbose = False nothing is printed or plotted (for headless runs).
+    Returns the number of topples (the size of the avalanche).
     """ 
-    toppled = False
+    toppled = 0
     for i in range(len(grid)): # Run through all grid sites
         # print(f"site: {i}") # For testing
         if i == 0 or i == len(grid) - 1: # Grains past the set number of sites are lost forever (= 0)
             # print(f"At site {i}, setting grains to 0.") # For testing
             grid[i] = 0
         elif int(grid[i]) - int(grid[i + 1]) > 2: # Mark site for toppling
-            toppled = True
-            print(f"Toppled!")            
-            direction = choice([-1, 1]) # Randomly choose left or right direction
+            toppled += 1
+            if verbose:
+                print(f"Toppled!")
+            direction = choose([-1, 1]) # Randomly choose left or right direction
             # print(f"Direction to topple: {direction}") # For testing
-            grid[i] -= 2
-            grid[i + direction] += 1
-            if abs(int(grid[i]) - int(grid[i + direction])) > 2: # If more than 2 larger on one side
-                grid[i + 2 * direction] += 1
-    plot_sandpile(grid)  # Call plot_sandpile after toppling
+            topple_site(grid, i, direction)
+    if verbose:
+        plot_sandpile(grid)  # Call plot_sandpile after toppling
+    return toppled
+
+def topple_site(grid, i:int, direction:int) -> None:
+    """
+    Step 3: Topple site i to the left (direction = -1) or right (direction = 1).
+    """
+    grid[i] -= 2
+    grid[i + direction] += 1
+    if abs(int(grid[i]) - int(grid[i + direction])) > 2: # If more than 2 larger on one side
+        if 0 <= i + 2 * direction < len(grid): # Past the boundary the grain is lost anyway
+            grid[i + 2 * direction] += 1
+
+def relax(grid, site:int, choose = choice) -> int:
+    """
+    Step 2 - 5 with a worklist: instead of sweeping over the whole grid, only the sites whose slope
+    h(i) - h(i + 1) may have changed are checked, and toppling goes on until the whole pile is stable.
+    Inputs: site = where the last grain was added; choose = picks the direction from (-1, 1)
+    Returns the number of topples (the size of the avalanche).
+    """
+    last = len(grid) - 1 # Grains past the set number of sites are lost forever (= 0)
+    stack = [site - 1, site] # Adding a grain changes the slopes at site - 1 and site
+    topples = 0
+    while stack:
+        i = stack.pop()
+        if i < 1 or i >= last or grid[i] - grid[i + 1] <= 2: # Not a site, or stable
+            continue
+        direction = choose((-1, 1)) # Randomly choose left or right direction
+        topple_site(grid, i, direction)
+        grid[0] = grid[last] = 0
+        topples += 1
+        # The heights of i, i + direction and i + 2 * direction changed, and with them the slopes just left of them
+        for changed in (i, i + direction, i + 2 * direction):
+            stack.append(changed - 1)
+            stack.append(changed)
+    return topples
 
 def plot_sandpile(grid) -> None:
     """
@@ -77,7 +124,160 @@ def run_sandpile(num_sites:int, iterations:int) -> None:
         drop_grains(grid, num_sites)  # Drop grains randomly across the sandpile
         topple(grid, num_sites) # Checks/handles sites to see if they need to be toppled
 
+def save_checkpoint(path:str, grid:list, rng:Random, counters:dict, num_sites:int, engine:str) -> None:
+    """
+    Saves the grid, the state of the random generator, the counters and the settings (num_sites and engine)
+    of a headless run to a compressed .npz file (through a temporary file, so an interrupted save never destroys the last checkpoint).
+    """
+    version, state, gauss = rng.getstate()
+    with open(path + ".tmp", "wb") as file:
+        np.savez_compressed(file, grid=np.array(grid, dtype=np.int32), rng_state=np.array(state, dtype=np.uint32),
+                            num_sites=np.int64(num_sites), engine=engine,
+                            **{name: np.int64(value) for name, value in counters.items()})
+    os.replace(path + ".tmp", path)
+
+def load_checkpoint(path:str) -> tuple:
+    """
+    Loads a checkpoint saved by save_checkpoint.
+    Returns the grid, the random generator, the counters and the settings.
+    """
+    with np.load(path) as data:
+        rng = Random()
+        rng.setstate((3, tuple(int(word) for word in data["rng_state"]), None))
+        counters = {name: int(data[name]) for name in ("grains", "topples", "avalanches", "largest")}
+        # Checkpoints from before the settings were saved: the grid has num_sites + 2 sites, and the engine is unknown
+        settings = {
+            "num_sites": int(data["num_sites"]) if "num_sites" in data else len(data["grid"]) - 2,
+            "engine": str(data["engine"]) if "engine" in data else None
+        }
+        return [float(height) for height in data["grid"]], rng, counters, settings
+
+def run_headless(num_sites:int, iterations:int, progress_every:int = 100000, render_every:int = None,
+                 engine:str = "worklist", seed:int = None, checkpoint:str = None, checkpoint_every:int = None,
+                 histogram:LogHistogram = None, warmup:int = 0, verbose:bool = True) -> dict:
+    """
+    Runs the sandpile without printing or plotting anything per grain, for long runs.
+    Inputs: progress_every = grains between progress lines (None for none);
+            render_every = grains between redraws of the sandpile (None for none);
+            engine = "worklist" (relax until stable) or "sweep" (one pass of topple per grain);
+            seed = seed of the run's own random generator;
+            checkpoint = file to save the run to every checkpoint_every grains (and to resume from, if it exists);
+            histogram = LogHistogram that gets the avalanche size of every grain after the first warmup grains;
+            verbose = False to not print the summary
+    Returns summary statistics of the run.
+    """
+    if checkpoint and histogram is not None:
+        raise ValueError("The avalanche histogram isn't saved in checkpoints, so it can't be combined with checkpoint.")
+    if checkpoint and os.path.exists(checkpoint):
+        grid, rng, counters, settings = load_checkpoint(checkpoint)
+        if settings["num_sites"] != num_sites:
+            raise ValueError(f"{checkpoint} is a run with {settings['num_sites']} sites, not {num_sites}.")
+        if settings["engine"] is not None and settings["engine"] != engine:
+            raise ValueError(f"{checkpoint} is a run with the {settings['engine']} engine, not {engine}.")
+        print(f"Resuming from {checkpoint} after {counters['grains']} grains.")
+    else:
+        grid = initialize_grid(num_sites).tolist() # This is the h(i) function (a list is faster to index one site at a time)
+        rng = Random(seed)
+        counters = {
+            "grains": 0, # Grains dropped so far
+            "topples": 0, # Total number of topples
+            "avalanches": 0, # Number of grains that caused at least one topple
+            "largest": 0 # Largest avalanche
+        }
+    first = counters["grains"]
+    start = time.perf_counter()
+    for iter in range(first, iterations):
+        site = drop_grains(grid, num_sites, verbose=False, choose=rng.choice)
+        if engine == "worklist":
+            size = relax(grid, site, rng.choice)
+        else:
+            size = topple(grid, num_sites, verbose=False, choose=rng.choice)
+        counters["topples"] += size
+        counters["avalanches"] += size > 0
+        counters["largest"] = max(counters["largest"], size)
+        if histogram is not None and iter >= warmup:
+            histogram.add(size)
+        grains = counters["grains"] = iter + 1
+        if render_every and grains % render_every == 0:
+            print(f"\nIteration: {grains}")
+            plot_sandpile(grid)
+        if progress_every and grains % progress_every == 0:
+            elapsed = time.perf_counter() - start
+            print(f"{grains} grains, {counters['topples']} topples, {(grains - first) / elapsed:.0f} grains/s")
+        if checkpoint and checkpoint_every and grains % checkpoint_every == 0:
+            save_checkpoint(checkpoint, grid, rng, counters, num_sites, engine)
+    if checkpoint:
+        save_checkpoint(checkpoint, grid, rng, counters, num_sites, engine)
+
+    elapsed = time.perf_counter() - start
+    summary = {
+        "grains": iterations,
+        "seconds": elapsed,
+        "grains_per_second": (iterations - first) / elapsed if elapsed > 0 else float("inf"),
+        "topples": counters["topples"],
+        "avalanches": counters["avalanches"],
+        "mean_avalanche_size": counters["topples"] / iterations if iterations else 0.0,
+        "largest_avalanche": counters["largest"],
+        "grains_on_pile": int(sum(grid[1:-1])),
+        "grains_lost": iterations - int(sum(grid[1:-1])),
+        "max_height": int(max(grid))
+    }
+    if verbose:
+        print("Summary:")
+        for key, value in summary.items():
+            print(f"  {key}: {value:.3f}" if isinstance(value, float) else f"  {key}: {value}")
+    return summary
+
+def run_realization(num_sites:int, iterations:int, warmup:int, engine:str, seed:np.random.SeedSequence) -> dict:
+    """
+    Runs one headless realization of an ensemble, with a random generator seeded from seed.
+    Returns the counts and zeros of its avalanche size histogram.
+    """
+    histogram = LogHistogram()
+    run_headless(num_sites, iterations, progress_every=None, engine=engine,
+                 seed=int.from_bytes(seed.generate_state(4).tobytes(), "little"), histogram=histogram,
+                 warmup=warmup, verbose=False)
+    return {"size": (histogram.counts, histogram.zeros)}
+
+def run_ensemble(num_sites:int, iterations:int, num_runs:int, seed:int = None, warmup:int = None,
+                 engine:str = "worklist", workers:int = None) -> dict:
+    """
+    Runs num_runs independent headless piles on a pool of processes, each with its own random stream
+    spawned from seed (so the result doesn't depend on the number of workers).
+    Inputs: warmup = grains dropped before the avalanches are recorded (default: num_sites^2, enough for
+            the pile to reach its steady slope)
+    Returns the merged avalanche size histogram (in a dict, like the 2D ensemble).
+    """
+    warmup = num_sites ** 2 if warmup is None else warmup
+    return ensemble(run_realization, (num_sites, warmup + iterations, warmup, engine), num_runs, seed, workers)
+
 if __name__ == "__main__":
-    iterations = 60  # Desired number of iterations
-    num_sites = 15 # Number of sites
-    run_sandpile(num_sites, iterations) # Runs the sandpile simulation
+    parser = argparse.ArgumentParser(description="Run the sandpile simulation.")
+    parser.add_argument("--sites", type=int, default=15, help="number of sites")
+    parser.add_argument("--iterations", type=int, default=60, help="number of grains dropped")
+    parser.add_argument("--headless", action="store_true", help="no output per grain, only progress and a summary")
+    parser.add_argument("--progress-every", type=int, default=100000, help="grains between progress lines (headless)")
+    parser.add_argument("--render-every", type=int, help="grains between redraws of the sandpile (headless)")
+    parser.add_argument("--engine", choices=["worklist", "sweep"], default="worklist",
+                        help="relax every avalanche until stable, or one sweep of the grid per grain (headless)")
+    parser.add_argument("--seed", type=int, help="seed for the random generator (headless)")
+    parser.add_argument("--checkpoint", help="file to save the run to, and to resume from if it exists (headless)")
+    parser.add_argument("--checkpoint-every", type=int, default=1000000, help="grains between checkpoints (headless)")
+    parser.add_argument("--runs", type=int, default=1, help="number of independent piles run in parallel (headless)")
+    parser.add_argument("--warmup", type=int, help="grains dropped before recording avalanches, per pile (--runs, default: sites^2)")
+    parser.add_argument("--workers", type=int, help="number of worker processes for --runs (default: number of cores)")
+    parser.add_argument("--output", help="file to save the avalanche size histogram to (.npz, --runs)")
+    args = parser.parse_args()
+
+    if args.headless and args.runs > 1:
+        histograms = run_ensemble(args.sites, args.iterations, args.runs, args.seed, args.warmup, args.engine, args.workers)
+        size = histograms["size"]
+        print(f"Avalanche size: {size.counts.sum()} avalanches in {args.runs * args.iterations} grains, "
+              f"exponent {size.fit_exponent(2, args.sites ** 2 / 10):.2f}")
+        if args.output:
+            save_histograms(histograms, args.output)
+    elif args.headless:
+        run_headless(args.sites, args.iterations, args.progress_every, args.render_every, args.engine,
+                     args.seed, args.checkpoint, args.checkpoint_every)
+    else:
+        run_sandpile(args.sites, args.iterations) # Runs the sandpile simulation
@@ -0,0 +1,319 @@
+import numpy as np
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+BLOCK = 65536 # Random sites are drawn this many at a time
+
+class LogHistogram:
+    """
+    Histogram with logarithmic bins: bin k holds the values in [2^k, 2^(k + 1)), and zeros are counted separately.
+    Values are collected in a buffer and binned with np.bincount a whole buffer at a time.
+    """
+    def __init__(self, num_bins:int = 64, buffer_size:int = 65536):
+        self.binned = np.zeros(num_bins, dtype=np.int64) # Counts of the values binned so far
+        self.binned_zeros = 0
+        self.buffer = np.zeros(buffer_size, dtype=np.int64)
+        self.filled = 0
+
+    @property
+    def counts(self) -> np.ndarray:
+        """
+        The number of values in each bin, including the ones still in the buffer.
+        """
+        self.flush()
+        return self.binned
+
+    @counts.setter
+    def counts(self, counts:np.ndarray) -> None:
+        self.flush()
+        self.binned = counts
+
+    @property
+    def zeros(self) -> int:
+        """
+        The number of zeros, including the ones still in the buffer.
+        """
+        self.flush()
+        return self.binned_zeros
+
+    @zeros.setter
+    def zeros(self, zeros:int) -> None:
+        self.flush()
+        self.binned_zeros = zeros
+
+    def add(self, value:int) -> None:
+        """
+        Adds one value (binned once the buffer is full).
+        """
+        self.buffer[self.filled] = value
+        self.filled += 1
+        if self.filled == len(self.buffer):
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Bins everything in the buffer.
+        """
+        if not self.filled:
+            return
+        values = self.buffer[:self.filled]
+        positive = values[values > 0]
+        self.binned_zeros += len(values) - len(positive)
+        bins = np.frexp(positive.astype(float))[1] - 1 # floor(log2(value)), exact for integers
+        self.binned += np.bincount(bins, minlength=len(self.binned))[:len(self.binned)]
+        self.filled = 0
+
+    def merge(self, other) -> None:
+        """
+        Adds the counts of another LogHistogram (e.g. from another run).
+        """
+        self.counts += other.counts
+        self.zeros += other.zeros
+
+    def edges(self) -> np.ndarray:
+        """
+        Returns the bin edges 1, 2, 4, 8, ...
+        """
+        return 2.0 ** np.arange(len(self.counts) + 1)
+
+    def density(self) -> np.ndarray:
+        """
+        Returns the probability density of the non-zero values in each bin (counts / bin width / total).
+        """
+        self.flush()
+        total = self.counts.sum()
+        return self.counts / np.diff(self.edges()) / total if total else np.zeros(len(self.counts))
+
+    def fit_exponent(self, low:float = 1, high:float = np.inf) -> float:
+        """
+        Fits P(s) ~ s^(-alpha) to the density of the bins between low and high (least squares in log-log).
+        Returns alpha.
+        """
+        density = self.density()
+        edges = self.edges()
+        centers = np.sqrt(edges[:-1] * edges[1:])
+        use = (density > 0) & (edges[:-1] >= low) & (edges[1:] <= high)
+        if use.sum() < 2:
+            return float("nan")
+        slope, _ = np.polyfit(np.log(centers[use]), np.log(density[use]), 1)
+        return -slope
+
+class Sandpile2D:
+    """
+    The two-dimensional Bak-Tang-Wiesenfeld sandpile on an L x L lattice with open edges.
+    A site with 4 or more grains topples: it loses 4 grains and each of its 4 neighbours gains one
+    (grains that fall over the edge are lost forever). Every toppling wave topples all unstable sites at once.
+    """
+    def __init__(self, num_sites:int, seed:int = None):
+        self.num_sites = num_sites
+        self.grid = np.zeros((num_sites + 2, num_sites + 2), dtype=np.int64) # With a ring of lost-forever sites
+        self.toppled = np.zeros(self.grid.shape, dtype=bool) # Sites toppled in the current avalanche
+        self.rng = np.random.default_rng(seed) # seed can also be a np.random.SeedSequence
+        self.grains = 0 # Grains dropped so far
+        self.sites = None # Current block of random sites
+        self.block_state = None # State of the random generator just before the current block was drawn
+        self.histograms = {"size": LogHistogram(), "duration": LogHistogram(), "area": LogHistogram()}
+
+    def add_grain(self, i:int, j:int) -> tuple:
+        """
+        Adds a grain to site (i, j) (1 to L) and topples until the pile is stable.
+        Returns the size (number of topples), duration (number of waves) and area (number of sites toppled) of the avalanche.
+        """
+        grid = self.grid
+        grid[i, j] += 1
+        if grid[i, j] < 4:
+            return 0, 0, 0
+
+        last = self.num_sites
+        top, bottom, left, right = i, i, j, j # Box around the sites that may be unstable
+        reach = [i, i, j, j] # Box around everything the avalanche touched
+        size = duration = 0
+        while True:
+            box = grid[top:bottom + 1, left:right + 1]
+            unstable = box >= 4
+            rows, columns = np.nonzero(unstable)
+            if len(rows) == 0:
+                break
+            size += len(rows)
+            duration += 1
+            self.toppled[top:bottom + 1, left:right + 1] |= unstable
+            # Topple every unstable site at once (the ring around the grid collects the lost grains)
+            falls = unstable.view(np.int8)
+            box -= falls << 2
+            grid[top - 1:bottom, left:right + 1] += falls
+            grid[top + 1:bottom + 2, left:right + 1] += falls
+            grid[top:bottom + 1, left - 1:right] += falls
+            grid[top:bottom + 1, left + 1:right + 2] += falls
+            # Only the toppled sites and their neighbours can be unstable now
+            top, bottom = max(1, top + int(rows[0]) - 1), min(last, top + int(rows[-1]) + 1)
+            left, right = max(1, left + int(columns.min()) - 1), min(last, left + int(columns.max()) + 1)
+            reach = [min(reach[0], top), max(reach[1], bottom), min(reach[2], left), max(reach[3], right)]
+        grid[0, :] = grid[-1, :] = grid[:, 0] = grid[:, -1] = 0 # Lost forever
+
+        toppled = self.toppled[reach[0]:reach[1] + 1, reach[2]:reach[3] + 1]
+        area = int(np.count_nonzero(toppled))
+        toppled[:] = False
+        return size, duration, area
+
+    def drop_grains(self, num_grains:int, record:bool = True, progress_every:int = None,
+                    checkpoint:str = None, checkpoint_every:int = None) -> None:
+        """
+        Drops num_grains grains on random sites, one at a time.
+        With record = True, the avalanches are added to the histograms (use False to let the pile reach its critical state).
+        With a checkpoint file, the whole state is saved there every checkpoint_every grains and at the end.
+        """
+        start = time.perf_counter()
+        for count in range(num_grains):
+            position = self.grains % BLOCK
+            if position == 0 or self.sites is None: # Draw the random sites in blocks
+                if position == 0:
+                    self.block_state = self.rng.bit_generator.state
+                self.sites = self.rng.integers(1, self.num_sites + 1, size=(BLOCK, 2)).tolist()
+            i, j = self.sites[position]
+            size, duration, area = self.add_grain(i, j)
+            self.grains += 1
+            if record:
+                self.histograms["size"].add(size)
+                self.histograms["duration"].add(duration)
+                self.histograms["area"].add(area)
+            if progress_every and (count + 1) % progress_every == 0:
+                print(f"{count + 1} grains, mean height {self.grid[1:-1, 1:-1].mean():.3f}, "
+                      f"{(count + 1) / (time.perf_counter() - start):.0f} grains/s")
+            if checkpoint and checkpoint_every and self.grains % checkpoint_every == 0:
+                self.save_checkpoint(checkpoint)
+        if checkpoint:
+            self.save_checkpoint(checkpoint)
+
+    def save_checkpoint(self, path:str) -> None:
+        """
+        Saves the grid (one byte per site), the random generator and the histograms to a compressed .npz file,
+        through a temporary file so that an interrupted save never destroys the last checkpoint.
+        """
+        with open(path + ".tmp", "wb") as file:
+            np.savez_compressed(file, grid=self.grid[1:-1, 1:-1].astype(np.uint8), grains=self.grains,
+                                rng_state=json.dumps(self.rng.bit_generator.state),
+                                block_state=json.dumps(self.block_state), **histogram_arrays(self.histograms))
+        os.replace(path + ".tmp", path)
+
+    @classmethod
+    def load_checkpoint(cls, path:str):
+        """
+        Loads a Sandpile2D saved by save_checkpoint; it continues exactly as if it had never stopped.
+        """
+        with np.load(path) as data:
+            sandpile = cls(len(data["grid"]))
+            sandpile.grid[1:-1, 1:-1] = data["grid"]
+            sandpile.grains = int(data["grains"])
+            sandpile.block_state = json.loads(str(data["block_state"]))
+            for name, histogram in sandpile.histograms.items():
+                histogram.counts[:] = data[f"{name}_counts"]
+                histogram.zeros = int(data[f"{name}_zeros"])
+            # In the middle of a block, the block is drawn again from the state it was drawn from
+            state = sandpile.block_state if sandpile.grains % BLOCK else json.loads(str(data["rng_state"]))
+        if state is not None:
+            sandpile.rng.bit_generator.state = state
+        return sandpile
+
+def run(num_sites:int, num_grains:int, warmup:int = None, seed = None, progress_every:int = None,
+        checkpoint:str = None, checkpoint_every:int = None) -> Sandpile2D:
+    """
+    Drops warmup grains (default: 2 L^2) without recording, then num_grains recorded grains.
+    If the checkpoint file exists, the run carries on from there instead of starting over.
+    Returns the Sandpile2D.
+    """
+    warmup = 2 * num_sites ** 2 if warmup is None else warmup
+    if checkpoint and os.path.exists(checkpoint):
+        sandpile = Sandpile2D.load_checkpoint(checkpoint)
+        if sandpile.num_sites != num_sites:
+            raise ValueError(f"{checkpoint} is a run with L = {sandpile.num_sites}, not {num_sites}.")
+        if progress_every:
+            print(f"Resuming from {checkpoint} after {sandpile.grains} grains.")
+    else:
+        sandpile = Sandpile2D(num_sites, seed)
+    sandpile.drop_grains(max(0, warmup - sandpile.grains), record=False,
+                         checkpoint=checkpoint, checkpoint_every=checkpoint_every)
+    sandpile.drop_grains(warmup + num_grains - sandpile.grains, progress_every=progress_every,
+                         checkpoint=checkpoint, checkpoint_every=checkpoint_every)
+    return sandpile
+
+def run_realization(num_sites:int, num_grains:int, warmup:int, seed:np.random.SeedSequence) -> dict:
+    """
+    Runs one realization of an ensemble.
+    Returns the counts and zeros of each histogram.
+    """
+    histograms = run(num_sites, num_grains, warmup, seed).histograms
+    for histogram in histograms.values():
+        histogram.flush()
+    return {name: (histogram.counts, histogram.zeros) for name, histogram in histograms.items()}
+
+def ensemble(realization, args:tuple, num_runs:int, seed:int = None, workers:int = None) -> dict:
+    """
+    Runs realization(*args, seed) num_runs times on a pool of processes, each with its own random stream
+    spawned from seed (so the result doesn't depend on the number of workers). The realization returns the
+    counts and zeros of each of its histograms, like run_realization.
+    Returns the merged histograms.
+    """
+    seeds = np.random.SeedSequence(seed).spawn(num_runs)
+    histograms = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(realization, *([arg] * num_runs for arg in args), seeds)
+        for result in results:
+            for name, (counts, zeros) in result.items():
+                histogram = histograms.setdefault(name, LogHistogram(len(counts)))
+                histogram.counts += counts
+                histogram.zeros += zeros
+    return histograms
+
+def run_ensemble(num_sites:int, num_grains:int, num_runs:int, seed:int = None, warmup:int = None,
+                 workers:int = None) -> dict:
+    """
+    Runs num_runs independent realizations on a pool of processes (see ensemble).
+    Returns the merged histograms.
+    """
+    return ensemble(run_realization, (num_sites, num_grains, warmup), num_runs, seed, workers)
+
+def histogram_arrays(histograms:dict) -> dict:
+    """
+    Returns the counts and zeros of each histogram as arrays named <name>_counts and <name>_zeros.
+    """
+    arrays = {}
+    for name, histogram in histograms.items():
+        histogram.flush()
+        arrays[f"{name}_counts"] = histogram.counts
+        arrays[f"{name}_zeros"] = histogram.zeros
+    return arrays
+
+def save_histograms(histograms:dict, path:str) -> None:
+    """
+    Saves the histograms (counts, zeros and bin edges) to a .npz file.
+    """
+    np.savez(path, edges=histograms["size"].edges(), **histogram_arrays(histograms))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the 2D Bak-Tang-Wiesenfeld sandpile and collect avalanche statistics.")
+    parser.add_argument("--sites", type=int, default=128, help="L, the lattice is L x L")
+    parser.add_argument("--grains", type=int, default=1000000, help="number of grains recorded")
+    parser.add_argument("--warmup", type=int, help="grains dropped first to reach the critical state (default: 2 L^2)")
+    parser.add_argument("--seed", type=int, default=5, help="seed for the random sites")
+    parser.add_argument("--progress-every", type=int, default=100000, help="grains between progress lines")
+    parser.add_argument("--output", help="file to save the histograms to (.npz)")
+    parser.add_argument("--checkpoint", help="file to save the state to (and to resume from, if it exists)")
+    parser.add_argument("--checkpoint-every", type=int, default=1000000, help="grains between checkpoints")
+    parser.add_argument("--runs", type=int, default=1, help="number of independent realizations (run in parallel)")
+    parser.add_argument("--workers", type=int, help="number of worker processes for --runs (default: number of cores)")
+    args = parser.parse_args()
+
+    if args.runs > 1:
+        histograms = run_ensemble(args.sites, args.grains, args.runs, args.seed, args.warmup, args.workers)
+    else:
+        histograms = run(args.sites, args.grains, args.warmup, args.seed, args.progress_every,
+                         args.checkpoint, args.checkpoint_every).histograms
+    # Fit below the cut-off caused by the size of the lattice
+    cutoffs = {"size": args.sites ** 2 / 10, "duration": args.sites / 2, "area": args.sites ** 2 / 10}
+    for name, histogram in histograms.items():
+        print(f"Avalanche {name}: {histogram.counts.sum()} avalanches, exponent {histogram.fit_exponent(2, cutoffs[name]):.2f}")
+    if args.output:
+        save_histograms(histograms, args.output)
@@ -0,0 +1,50 @@
+import unittest
+import numpy as np
+from sandpile2d import LogHistogram, run
+import main
+
+# Checks the avalanche histograms of the 2D sandpile
+class TestLogHistogram(unittest.TestCase):
+
+    def test_counts_include_buffer(self):
+        """This function tests that counts and zeros include the values still in the buffer."""
+        histogram = LogHistogram(num_bins=8, buffer_size=16)
+        for value in [0, 1, 2, 3, 4, 7, 8, 100, 0, 5] * 3:
+            histogram.add(value)
+        self.assertEqual(histogram.counts.tolist(), [3, 6, 9, 3, 0, 0, 3, 0])
+        self.assertEqual(histogram.zeros, 6)
+
+    def test_every_grain_counted(self):
+        """This function tests that every recorded grain ends up in each histogram, also when the run is
+        shorter than the buffer."""
+        num_grains = 3000
+        histograms = run(8, num_grains, warmup=200, seed=5).histograms
+        for name, histogram in histograms.items():
+            with self.subTest(name=name):
+                self.assertEqual(histogram.counts.sum() + histogram.zeros, num_grains)
+
+    def test_merge(self):
+        """This function tests that merging two histograms gives the same counts as adding all values to one."""
+        values = np.random.default_rng(5).integers(0, 1000, 500)
+        first, second, both = LogHistogram(buffer_size=64), LogHistogram(buffer_size=64), LogHistogram(buffer_size=64)
+        for value in values[:200]:
+            first.add(value)
+        for value in values[200:]:
+            second.add(value)
+        for value in values:
+            both.add(value)
+        first.merge(second)
+        self.assertEqual(first.counts.tolist(), both.counts.tolist())
+        self.assertEqual(first.zeros, both.zeros)
+
+    def test_1d_ensemble(self):
+        """This function tests that the 1D ensemble records every grain after the warmup, and gives the same
+        histogram for any number of workers."""
+        one = main.run_ensemble(20, 500, 3, seed=5, warmup=100, workers=1)["size"]
+        two = main.run_ensemble(20, 500, 3, seed=5, warmup=100, workers=2)["size"]
+        self.assertEqual(one.counts.sum() + one.zeros, 3 * 500)
+        self.assertEqual(one.counts.tolist(), two.counts.tolist())
+        self.assertEqual(one.zeros, two.zeros)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+# Importing the necessary libraries
+import json
+import calculator
+from calculator import calculate_delivery_fee, calculate_delivery_fees
+from validator import validate_order, validate_orders
+
+# An asyncio/ASGI version of the /delivery and /delivery/batch endpoints
+# It uses the same validation and fee calculation as the Flask app, but no framework,
+# so it can be served by any ASGI server (e.g. uvicorn) and compared against the WSGI version.
+
+def delivery(delivery_info) -> tuple:
+  """This function handles a /delivery payload.
+  Returns the status code and the response payload."""
+  order, errors = validate_order(delivery_info)
+  if errors:
+    return 400, {"errors": errors}
+  if calculator.fee_cache is not None:
+    return 200, calculator.fee_cache.get_fee(*order)
+  return 200, calculate_delivery_fee(*order)
+
+def delivery_batch(batch_info) -> tuple:
+  """This function handles a /delivery/batch payload.
+  Returns the status code and the response payload."""
+  orders = batch_info.get("orders", []) if type(batch_info) is dict else None
+  checked, errors = validate_orders(orders)
+  if errors:
+    return 400, {"errors": errors}
+  cart_values, delivery_dists, num_items, times = zip(*checked) if checked else ([], [], [], [])
+  return 200, {"delivery_fees": calculate_delivery_fees(cart_values, delivery_dists, num_items, times).tolist()}
+
+# Routes served by the ASGI app
+ROUTES = {"/delivery": delivery, "/delivery/batch": delivery_batch}
+
+async def read_body(receive) -> bytes:
+  """This function collects the (possibly chunked) request body."""
+  body = b""
+  more_body = True
+  while more_body:
+    message = await receive()
+    body += message.get("body", b"")
+    more_body = message.get("more_body", False)
+  return body
+
+async def send_json(send, status:int, payload:dict) -> None:
+  """This function sends a JSON response."""
+  body = json.dumps(payload).encode()
+  await send({"type": "http.response.start", "status": status,
+              "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]})
+  await send({"type": "http.response.body", "body": body})
+
+async def app(scope, receive, send) -> None:
+  """The ASGI application."""
+  if scope["type"] == "lifespan":
+    # Nothing to set up or tear down
+    while True:
+      message = await receive()
+      if message["type"] == "lifespan.startup":
+        await send({"type": "lifespan.startup.complete"})
+      elif message["type"] == "lifespan.shutdown":
+        await send({"type": "lifespan.shutdown.complete"})
+        return
+
+  handler = ROUTES.get(scope["path"].rstrip("/") or "/")
+  if handler is None:
+    await send_json(send, 404, {"message": "The requested URL was not found on the server."})
+    return
+  if scope["method"] != "POST":
+    await send_json(send, 405, {"message": "The method is not allowed for the requested URL."})
+    return
+
+  body = await read_body(receive)
+  try:
+    payload = json.loads(body)
+  except ValueError:
+    payload = None
+  status, response = handler(payload)
+  await send_json(send, status, response)
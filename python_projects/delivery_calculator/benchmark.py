@@ -0,0 +1,227 @@
+# Importing the necessary libraries
+import argparse
+import http.client
+import json
+import math
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+# Payloads that can be mixed together in a benchmark run
+PAYLOADS = {
+  # Normal weekday order
+  "valid": {"cart_value": 1500, "delivery_distance": 1499, "number_of_items": 3, "time": "2024-01-15T13:00:00Z"},
+  # Fails validation (and returns a 400)
+  "invalid": {"cart_value": "790", "delivery_distance": -1, "number_of_items": 4, "time": "2024-01-15 13:00"},
+  # Friday rush hour multiplier
+  "rush-hour": {"cart_value": 890, "delivery_distance": 1800, "number_of_items": 6, "time": "2024-01-19T16:30:00Z"},
+  # Hits the 15€ cap
+  "max-cap": {"cart_value": 790, "delivery_distance": 2235, "number_of_items": 13, "time": "2024-01-19T16:00:00Z"}
+}
+
+def parse_mix(text:str) -> dict:
+  """This function parses a payload mix such as 'valid=0.7,invalid=0.1,rush-hour=0.1,max-cap=0.1'.
+  Returns the weights normalized so that they add up to 1."""
+  mix = {}
+  for part in text.split(","):
+    name, _, weight = part.partition("=")
+    if name not in PAYLOADS:
+      raise ValueError(f"Unknown payload '{name}'. Choose from: {', '.join(PAYLOADS)}.")
+    mix[name] = float(weight or 1)
+  total = sum(mix.values())
+  return {name: weight / total for name, weight in mix.items()}
+
+def build_requests(mix:dict, num_requests:int, seed:int = 5) -> list:
+  """This function draws the request bodies for a run (the same ones for the same seed).
+  Returns a list of (payload name, JSON body) pairs."""
+  rng = random.Random(seed)
+  bodies = {name: json.dumps(payload).encode() for name, payload in PAYLOADS.items()}
+  names = rng.choices(list(mix), weights=list(mix.values()), k=num_requests)
+  return [(name, bodies[name]) for name in names]
+
+def flask_client_sender():
+  """This function returns a sender that goes through the Flask test client (no network)."""
+  from calculator import app
+  client = app.test_client()
+
+  def send(body:bytes) -> int:
+    return client.post("/delivery", data=body, content_type="application/json").status_code
+  return send
+
+def http_sender(host:str, port:int):
+  """This function returns a sender that keeps one HTTP connection open to a running server."""
+  connection = http.client.HTTPConnection(host, port)
+  headers = {"Content-Type": "application/json"}
+
+  def send(body:bytes) -> int:
+    connection.request("POST", "/delivery", body=body, headers=headers)
+    response = connection.getresponse()
+    response.read()
+    return response.status
+  return send
+
+def percentile(sorted_values:list, q:float) -> float:
+  """This function returns the q-th percentile (0-100) of an already sorted list (nearest rank)."""
+  if not sorted_values:
+    return float("nan")
+  return sorted_values[max(0, math.ceil(q / 100 * len(sorted_values)) - 1)]
+
+def run_benchmark(make_sender, requests:list, concurrency:int, warmup:int = 100) -> dict:
+  """This function sends all of the requests from concurrency threads, each with its own sender.
+  Each thread first sends the first warmup requests of its share untimed; the clock starts once every thread is warm.
+  Returns the throughput, latency percentiles (in milliseconds) and status codes."""
+  warm = threading.Barrier(concurrency + 1)
+
+  def worker(share:list) -> list:
+    try:
+      send = make_sender()
+      for _, body in share[:warmup]:
+        send(body)
+    except BaseException:
+      warm.abort() # Don't leave the other threads waiting for this one
+      raise
+    warm.wait()
+    results = []
+    for name, body in share:
+      start = time.perf_counter()
+      status = send(body)
+      results.append((name, status, time.perf_counter() - start))
+    return results
+
+  shares = [requests[i::concurrency] for i in range(concurrency)]
+  with ThreadPoolExecutor(max_workers=concurrency) as pool:
+    futures = [pool.submit(worker, share) for share in shares]
+    try:
+      warm.wait()
+    except threading.BrokenBarrierError:
+      pass # A thread failed during its warmup, and its error is raised by result() below
+    start = time.perf_counter()
+    results = [result for future in futures for result in future.result()]
+  elapsed = time.perf_counter() - start
+
+  latencies = sorted(seconds * 1000 for _, _, seconds in results)
+  statuses = {}
+  for _, status, _ in results:
+    statuses[str(status)] = statuses.get(str(status), 0) + 1
+  return {
+    "requests": len(results),
+    "seconds": elapsed,
+    "requests_per_second": len(results) / elapsed,
+    "latency_ms": {
+      "mean": sum(latencies) / len(latencies),
+      "p50": percentile(latencies, 50),
+      "p90": percentile(latencies, 90),
+      "p99": percentile(latencies, 99),
+      "max": latencies[-1]
+    },
+    "statuses": statuses
+  }
+
+def free_port() -> int:
+  """This function asks the operating system for a free port."""
+  with socket.socket() as sock:
+    sock.bind(("127.0.0.1", 0))
+    return sock.getsockname()[1]
+
+def start_server(server:str, port:int, workers:int, threads:int, timeout:float = 30.0) -> subprocess.Popen:
+  """This function starts serve.py in the background and waits until it accepts connections."""
+  serve_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "serve.py")
+  process = subprocess.Popen([sys.executable, serve_path, "--server", server, "--port", str(port),
+                              "--workers", str(workers), "--threads", str(threads)],
+                             stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+  deadline = time.monotonic() + timeout
+  while time.monotonic() < deadline:
+    try:
+      socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+      return process
+    except OSError:
+      if process.poll() is not None:
+        raise RuntimeError(f"The {server} server exited before it started listening.")
+      time.sleep(0.1)
+  process.terminate()
+  raise RuntimeError(f"The {server} server did not start within {timeout} seconds.")
+
+def compare(results:dict, baseline:dict) -> None:
+  """This function prints how much the throughput and latencies changed since a saved run."""
+  old, new = baseline["results"], results["results"]
+  change = lambda a, b: f"{(b - a) / a * 100:+.1f}%" if a else "n/a"
+  print(f"requests/s: {old['requests_per_second']:.0f} -> {new['requests_per_second']:.0f} "
+        f"({change(old['requests_per_second'], new['requests_per_second'])})")
+  for key in ["p50", "p90", "p99"]:
+    a, b = old["latency_ms"][key], new["latency_ms"][key]
+    print(f"{key} latency: {a:.3f} ms -> {b:.3f} ms ({change(a, b)})")
+
+def main(argv=None) -> None:
+  """This function runs the benchmark from the command line."""
+  parser = argparse.ArgumentParser(description="Benchmark the /delivery endpoint.")
+  parser.add_argument("--mode", choices=["inprocess", "server"], default="inprocess",
+                      help="inprocess uses the Flask test client, server starts serve.py (or uses --url)")
+  parser.add_argument("--server", choices=["gunicorn", "waitress", "uvicorn"], default="waitress",
+                      help="server started by serve.py in server mode")
+  parser.add_argument("--url", help="host:port of an already running server (server mode only)")
+  parser.add_argument("--workers", type=int, default=1, help="worker processes for the started server")
+  parser.add_argument("--threads", type=int, default=4, help="threads per worker for the started server")
+  parser.add_argument("--requests", type=int, default=10000, help="number of requests to send")
+  parser.add_argument("--concurrency", type=int, default=1, help="number of client threads")
+  parser.add_argument("--mix", default="valid=0.7,invalid=0.1,rush-hour=0.1,max-cap=0.1",
+                      help="payload mix, e.g. valid=0.7,invalid=0.1,rush-hour=0.1,max-cap=0.1")
+  parser.add_argument("--seed", type=int, default=5, help="seed for drawing the payload mix")
+  parser.add_argument("--output", help="file to save the results to (JSON)")
+  parser.add_argument("--baseline", help="saved results to compare this run against")
+  args = parser.parse_args(argv)
+
+  mix = parse_mix(args.mix)
+  requests = build_requests(mix, args.requests, args.seed)
+
+  process = None
+  if args.mode == "inprocess":
+    make_sender = flask_client_sender
+  else:
+    if args.url:
+      host, _, port = args.url.rpartition(":")
+      port = int(port)
+    else:
+      host, port = "127.0.0.1", free_port()
+      process = start_server(args.server, port, args.workers, args.threads)
+    make_sender = lambda: http_sender(host, port)
+
+  try:
+    results = run_benchmark(make_sender, requests, args.concurrency)
+  finally:
+    if process is not None:
+      process.terminate()
+      process.wait()
+
+  report = {
+    "timestamp": datetime.now(timezone.utc).isoformat(),
+    "python": platform.python_version(),
+    "platform": platform.platform(),
+    "config": {
+      "mode": args.mode,
+      "server": args.server if args.mode == "server" and not args.url else args.url,
+      "workers": args.workers,
+      "threads": args.threads,
+      "concurrency": args.concurrency,
+      "mix": mix,
+      "seed": args.seed
+    },
+    "results": results
+  }
+  print(json.dumps(report["results"], indent=2))
+
+  if args.output:
+    with open(args.output, "w") as file:
+      json.dump(report, file, indent=2)
+  if args.baseline:
+    with open(args.baseline) as file:
+      compare(report, json.load(file))
+
+if __name__ == "__main__":
+  main()
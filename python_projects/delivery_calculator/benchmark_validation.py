@@ -0,0 +1,36 @@
+# Importing the necessary libraries
+import timeit
+from calculator import check_values
+from validator import validate_order
+
+# Payloads used for the benchmark (one valid, and a few common ways of getting it wrong)
+PAYLOADS = {
+  "valid": {"cart_value": 790, "delivery_distance": 2235, "number_of_items": 13, "time": "2024-01-19T16:00:00Z"},
+  "bad integer": {"cart_value": "790", "delivery_distance": 2235, "number_of_items": 13, "time": "2024-01-19T16:00:00Z"},
+  "bad time": {"cart_value": 790, "delivery_distance": 2235, "number_of_items": 13, "time": "19.01.2024 16:00"},
+  "all bad": {"cart_value": -1, "delivery_distance": None, "number_of_items": 0, "time": "2024-02-30T16:00:00Z"}
+}
+
+def run_check_values(delivery_info:dict) -> None:
+  """This function runs the old check_values the way the Calculator resource used to."""
+  try:
+    check_values(delivery_info.get("cart_value"), delivery_info.get("delivery_distance"),
+                 delivery_info.get("number_of_items"), delivery_info.get("time"))
+  except (TypeError, ValueError):
+    pass
+
+def benchmark(number:int = 100000, repeat:int = 5) -> dict:
+  """This function times check_values and validate_order on every payload.
+  Returns the best time per call (in microseconds) for each payload and validator."""
+  results = {}
+  for name, delivery_info in PAYLOADS.items():
+    old = min(timeit.repeat(lambda: run_check_values(delivery_info), number=number, repeat=repeat)) / number
+    new = min(timeit.repeat(lambda: validate_order(delivery_info), number=number, repeat=repeat)) / number
+    results[name] = {"check_values": old * 1e6, "validate_order": new * 1e6}
+  return results
+
+if __name__ == "__main__":
+  print(f"{'payload':<12} {'check_values':>14} {'validate_order':>16} {'speed-up':>9}")
+  for name, times in benchmark().items():
+    print(f"{name:<12} {times['check_values']:>11.2f} us {times['validate_order']:>13.2f} us "
+          f"{times['check_values'] / times['validate_order']:>8.1f}x")
@@ -0,0 +1,143 @@
+# Importing the necessary libraries
+import argparse
+import csv
+import json
+import sys
+import time
+from collections import Counter
+from itertools import islice
+from calculator import calculate_delivery_fees
+from validator import validate_order
+
+# Fields of a delivery order (same names as the /delivery payload)
+FIELDS = ["cart_value", "delivery_distance", "number_of_items", "time"]
+
+def to_int(value):
+  """This function turns a CSV text field into an integer if it looks like one.
+  Anything else is returned unchanged so that validate_order can reject it."""
+  try:
+    return int(value)
+  except (TypeError, ValueError):
+    return value
+
+def read_orders(file, file_format:str):
+  """This function reads orders one at a time from an NDJSON or CSV file.
+  Yields a dictionary per order, or None for a line that could not be parsed."""
+  if file_format == "csv":
+    for row in csv.DictReader(file):
+      yield {field: to_int(row.get(field)) if field != "time" else row.get(field) for field in FIELDS}
+  else:
+    for line in file:
+      if not line.strip():
+        continue
+      try:
+        order = json.loads(line)
+      except ValueError:
+        order = None
+      yield order if isinstance(order, dict) else None
+
+def price_chunk(orders:list, rejected:Counter) -> list:
+  """This function checks and prices one chunk of orders.
+  Rejected orders are counted in rejected once each, under their first error.
+  Returns a list of (order, delivery fee) pairs for the valid orders."""
+  valid_orders = []
+  checked = []
+  for order in orders:
+    if order is None:
+      rejected["Invalid JSON."] += 1
+      continue
+    checked_order, errors = validate_order(order)
+    if errors:
+      rejected[errors[0]["message"]] += 1
+      continue
+    checked.append(checked_order)
+    valid_orders.append(order)
+
+  if not checked:
+    return []
+
+  # Calculating the fees for the whole chunk in one vectorized pass
+  delivery_fees = calculate_delivery_fees(*zip(*checked))
+  return list(zip(valid_orders, delivery_fees.tolist()))
+
+def process_orders(infile, outfile, file_format:str = "ndjson", output_format:str = None,
+                   chunk_size:int = 10000, progress = None) -> dict:
+  """This function streams orders from infile to outfile in chunks of chunk_size,
+  so only one chunk is ever held in memory. Each priced order is written with its delivery_fee.
+  Returns a summary with the row counts, rejection reasons and throughput."""
+  output_format = output_format or file_format
+  if output_format == "csv":
+    writer = csv.DictWriter(outfile, fieldnames=FIELDS + ["delivery_fee"], extrasaction="ignore")
+    writer.writeheader()
+    write_row = writer.writerow
+  else:
+    write_row = lambda row: outfile.write(json.dumps(row) + "\n")
+
+  orders = read_orders(infile, file_format)
+  rejected = Counter()
+  rows = 0
+  priced = 0
+  start = time.perf_counter()
+
+  while True:
+    chunk = list(islice(orders, chunk_size))
+    if not chunk:
+      break
+    for order, delivery_fee in price_chunk(chunk, rejected):
+      write_row({**order, "delivery_fee": delivery_fee})
+      priced += 1
+    rows += len(chunk)
+
+    # Reporting progress after every chunk
+    if progress is not None:
+      elapsed = time.perf_counter() - start
+      print(f"Processed {rows} rows ({rows / elapsed:.0f} rows/s)", file=progress)
+
+  elapsed = time.perf_counter() - start
+  return {
+    "rows": rows,
+    "priced": priced,
+    "rejected": rows - priced,
+    "rejected_by_reason": dict(rejected),
+    "seconds": elapsed,
+    "rows_per_second": rows / elapsed if elapsed > 0 else 0.0
+  }
+
+def guess_format(path:str, default:str = "ndjson") -> str:
+  """This function guesses the file format from the file extension."""
+  if path.endswith(".csv"):
+    return "csv"
+  if path.endswith((".ndjson", ".jsonl", ".json")):
+    return "ndjson"
+  return default
+
+def main(argv=None) -> None:
+  """This function runs the bulk calculator from the command line."""
+  parser = argparse.ArgumentParser(description="Calculate delivery fees for a whole file of orders.")
+  parser.add_argument("input", help="NDJSON or CSV file of orders ('-' for standard input)")
+  parser.add_argument("output", help="file to write the priced orders to ('-' for standard output)")
+  parser.add_argument("--format", choices=["ndjson", "csv"], help="input format (guessed from the file name by default)")
+  parser.add_argument("--output-format", choices=["ndjson", "csv"], help="output format (same as the input by default)")
+  parser.add_argument("--chunk-size", type=int, default=10000, help="number of orders held in memory at a time")
+  parser.add_argument("--quiet", action="store_true", help="only print the final summary")
+  args = parser.parse_args(argv)
+
+  file_format = args.format or guess_format(args.input)
+  output_format = args.output_format or (guess_format(args.output, file_format) if args.output != "-" else file_format)
+
+  infile = sys.stdin if args.input == "-" else open(args.input, newline="")
+  outfile = sys.stdout if args.output == "-" else open(args.output, "w", newline="")
+  try:
+    summary = process_orders(infile, outfile, file_format, output_format, args.chunk_size,
+                             progress=None if args.quiet else sys.stderr)
+  finally:
+    if infile is not sys.stdin:
+      infile.close()
+    if outfile is not sys.stdout:
+      outfile.close()
+
+  # Printing the summary so the nightly job can be sized
+  print(json.dumps(summary, indent=2), file=sys.stderr)
+
+if __name__ == "__main__":
+  main()
@@ -1,7 +1,13 @@
 # Importing the necessary libraries
-from flask import Flask, request
+from flask import Flask, Response, g, request
 from flask_restful import Api, Resource
+from flask_restful.representations.json import output_json
 from datetime import datetime
+import os
+import numpy as np
+from fee_cache import FeeCache
+from metrics import Metrics, NULL_TIMER
+from validator import validate_order, validate_orders
 
 # Initializing API
 app = Flask(__name__)
@@ -48,8 +54,46 @@ def calculate_delivery_fee(cart_value:int, delivery_dist:int, num_items:int, tim
   # Returning to post method (in JSON format)
   return {"delivery_fee": int(delivery_fee)}
 
+def calculate_delivery_fees(cart_values, delivery_dists, num_items, times) -> np.ndarray:
+  """This function calculates the delivery fees for a whole batch of orders at once.
+  Takes arrays of cart values, distances, item counts and delivery times (datetime objects),
+  and applies the same rules as calculate_delivery_fee in one vectorized pass.
+  Returns the fees as a NumPy array of integers."""
+  cart_values = np.asarray(cart_values, dtype=np.int64)
+  delivery_dists = np.asarray(delivery_dists, dtype=np.int64)
+  num_items = np.asarray(num_items, dtype=np.int64)
+  times = np.asarray(times, dtype="datetime64[s]")
+  
+  # Is delivery at least 10€?
+  delivery_fee = np.where(cart_values < 1000, 1000 - cart_values, 0)
+  
+  # Is delivery distance > 1000m?
+  extra = ((delivery_dists - 1000) // 500) + 1
+  delivery_fee += np.where(delivery_dists <= 1000, 200, (2 + extra) * 100)
+  
+  # Are there 5 or more items?
+  surcharge = np.where(num_items >= 5, (num_items - 4) * 50, 0)
+  surcharge += np.where(num_items > 12, 120, 0)
+  delivery_fee += surcharge
+  
+  # Is the time Friday 15:00-19:00 UTC?
+  days = times.astype("datetime64[D]")
+  weekday = (days.astype(np.int64) + 3) % 7 # 1970-01-01 was a Thursday (0=Monday-6=Sunday)
+  hour = (times - days).astype("timedelta64[h]").astype(np.int64)
+  rush = (weekday == 4) & (hour >= 15) & (hour < 19)
+  delivery_fee = np.where(rush, delivery_fee * 1.2, delivery_fee)
+  
+  # Is the total delivery fee over 15€?
+  delivery_fee = np.minimum(delivery_fee, 1500)
+  
+  # Cart value over 200€ = 0€ delivery fee
+  delivery_fee = np.where(cart_values < 20000, delivery_fee, 0)
+  
+  return delivery_fee.astype(np.int64)
+
 def check_values(cart_value:int, delivery_dist:int, num_items:int, time:str):
-  """This function checks for errors. Returns delivery info if no errors."""
+  """This function checks for errors. Returns delivery info if no errors.
+  (The API itself uses validate_order from validator.py, which returns all errors at once.)"""
   try:
     # Checking for all positive integers
     if not all(type(value) == int and value > 0 for value in [cart_value, delivery_dist, num_items]):
@@ -69,29 +113,88 @@ def check_values(cart_value:int, delivery_dist:int, num_items:int, time:str):
   # If no errors
   return cart_value, delivery_dist, num_items, time
 
+# Optional cache in front of calculate_delivery_fee
+# Switched on by setting FEE_CACHE_SIZE (and optionally FEE_CACHE_TTL in seconds)
+fee_cache = None
+if os.environ.get("FEE_CACHE_SIZE"):
+  fee_cache = FeeCache(calculate_delivery_fee, maxsize=int(os.environ["FEE_CACHE_SIZE"]),
+                       ttl=float(os.environ["FEE_CACHE_TTL"]) if os.environ.get("FEE_CACHE_TTL") else None)
+
+# Optional per-stage timing of the requests, reported on /metrics
+# Switched on by setting DELIVERY_METRICS=1 (when it is off, the timers do nothing)
+metrics = Metrics(enabled=os.environ.get("DELIVERY_METRICS") == "1")
+
 # Creating a resource that handles delivery info
 class Calculator(Resource):
   def post(self):
-    # Getting delivery_info from test.py
-    delivery_info = request.get_json()
+    timer = g.metrics_timer = metrics.timer("/delivery")
     
-    # Extracting and defining the info
-    cart_value = delivery_info.get("cart_value")
-    delivery_dist = delivery_info.get("delivery_distance")
-    num_items = delivery_info.get("number_of_items")
-    time = delivery_info.get("time")
+    # Getting delivery_info from test.py (None if the body is not valid JSON)
+    delivery_info = request.get_json(silent=True)
+    timer.lap("parse")
     
     # Performing error and formatting checks on the values before calculating the delivery fee
-    cart_value, delivery_dist, num_items, time = check_values(cart_value, delivery_dist, num_items, time)
+    # Every problem with the payload is sent back at once as a 400 response
+    order, errors = validate_order(delivery_info)
+    timer.lap("validate")
+    if errors:
+      return {"errors": errors}, 400
+    cart_value, delivery_dist, num_items, time = order
     
-    # Calling the function to calculate fees
-    delivery_fee = calculate_delivery_fee(cart_value, delivery_dist, num_items, time)
+    # Calling the function to calculate fees (through the cache if it is switched on)
+    if fee_cache is not None:
+      delivery_fee = fee_cache.get_fee(cart_value, delivery_dist, num_items, time)
+    else:
+      delivery_fee = calculate_delivery_fee(cart_value, delivery_dist, num_items, time)
+    timer.lap("calculate")
     
     # Returning the delivery fee back to the user
     return delivery_fee
   
-# Registering the resource
+# Creating a resource that handles a whole basket of orders in one request
+class BatchCalculator(Resource):
+  def post(self):
+    timer = g.metrics_timer = metrics.timer("/delivery/batch")
+    
+    # Getting the list of orders, each one formatted like the /delivery payload
+    batch_info = request.get_json(silent=True)
+    orders = batch_info.get("orders", []) if type(batch_info) is dict else None
+    timer.lap("parse")
+    
+    # Performing the same error and formatting checks on every order
+    checked, errors = validate_orders(orders)
+    timer.lap("validate")
+    if errors:
+      return {"errors": errors}, 400
+    cart_values, delivery_dists, num_items, times = zip(*checked) if checked else ([], [], [], [])
+    
+    # Calculating all of the fees in one go
+    delivery_fees = calculate_delivery_fees(cart_values, delivery_dists, num_items, times)
+    timer.lap("calculate")
+    
+    # Returning the fees in the same order as the orders were sent
+    return {"delivery_fees": delivery_fees.tolist()}
+  
+# Turning the responses into JSON, timed as the last stage of the request
+@api.representation("application/json")
+def output_timed_json(data, code, headers=None):
+  response = output_json(data, code, headers)
+  timer = g.get("metrics_timer", NULL_TIMER)
+  timer.lap("serialize")
+  timer.finish(code)
+  return response
+
+# Reporting the latency histograms and request/error counters (Prometheus text format)
+@app.route("/metrics")
+def show_metrics():
+  extra = None
+  if fee_cache is not None:
+    extra = {f"delivery_fee_cache_{name}": value for name, value in fee_cache.stats().items()}
+  return Response(metrics.render(extra), mimetype="text/plain; version=0.0.4")
+
+# Registering the resources
 api.add_resource(Calculator, "/delivery")
+api.add_resource(BatchCalculator, "/delivery/batch")
 
 # Starting the Flask server (in debug mode)
 if __name__ == "__main__":
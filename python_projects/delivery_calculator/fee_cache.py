@@ -0,0 +1,85 @@
+# Importing the necessary libraries
+import threading
+import time as clock
+from collections import OrderedDict
+
+def quote_key(cart_value:int, delivery_dist:int, num_items:int, time) -> tuple:
+  """This function normalizes the inputs of calculate_delivery_fee.
+  Orders that are guaranteed to get the same fee get the same key.
+  Returns the key as a (cart band, distance bucket, item count, surge) tuple."""
+  # Cart value over 200€ = 0€ delivery fee, whatever the other inputs are
+  if cart_value >= 20000:
+    return (20000, 0, 0, False)
+
+  # Below 10€ every cent changes the surcharge, above that the cart value doesn't matter
+  cart_band = cart_value if cart_value < 1000 else 1000
+
+  # Distance is charged in 500m steps after the first 1000m
+  distance_bucket = 0 if delivery_dist <= 1000 else ((delivery_dist - 1000) // 500) + 1
+
+  # Fewer than 5 items are all charged the same
+  item_count = num_items if num_items >= 5 else 4
+
+  # Friday 15:00-19:00 UTC
+  surge = time.weekday() == 4 and 15 <= time.hour < 19
+  return (cart_band, distance_bucket, item_count, surge)
+
+# A bounded LRU cache (with an optional time-to-live) in front of the fee calculation
+# Keeps track of hits, misses and evictions so you can see if it pays off
+class FeeCache:
+  def __init__(self, fee_function, maxsize:int = 1024, ttl:float = None, timer=clock.monotonic):
+    self.fee_function = fee_function # Function that calculates a fee on a cache miss
+    self.maxsize = maxsize # Maximum number of cached quotes
+    self.ttl = ttl # Seconds before a quote expires (None = never)
+    self.timer = timer # Clock used for the time-to-live
+    self.entries = OrderedDict() # key -> (fee, expiry time), least recently used first
+    self.lock = threading.Lock()
+    self.hits = 0
+    self.misses = 0
+    self.evictions = 0
+
+  def get_fee(self, cart_value:int, delivery_dist:int, num_items:int, time) -> dict:
+    """Returns the delivery fee for an order, calculating it only on a cache miss"""
+    key = quote_key(cart_value, delivery_dist, num_items, time)
+    with self.lock:
+      entry = self.entries.get(key)
+      if entry is not None:
+        fee, expires = entry
+        if expires is None or self.timer() < expires:
+          self.hits += 1
+          self.entries.move_to_end(key)
+          return dict(fee)
+        # Quote has expired
+        del self.entries[key]
+        self.evictions += 1
+      self.misses += 1
+
+    # Calculating outside of the lock so a slow calculation doesn't block other requests
+    fee = self.fee_function(cart_value, delivery_dist, num_items, time)
+    expires = None if self.ttl is None else self.timer() + self.ttl
+    with self.lock:
+      self.entries[key] = (fee, expires)
+      self.entries.move_to_end(key)
+      while len(self.entries) > self.maxsize:
+        self.entries.popitem(last=False)
+        self.evictions += 1
+    return dict(fee)
+
+  def clear(self) -> None:
+    """Removes all cached quotes and resets the counters"""
+    with self.lock:
+      self.entries.clear()
+      self.hits = self.misses = self.evictions = 0
+
+  def stats(self) -> dict:
+    """Returns the hit, miss and eviction counters along with the hit rate"""
+    with self.lock:
+      lookups = self.hits + self.misses
+      return {
+        "hits": self.hits,
+        "misses": self.misses,
+        "evictions": self.evictions,
+        "size": len(self.entries),
+        "maxsize": self.maxsize,
+        "hit_rate": self.hits / lookups if lookups else 0.0
+      }
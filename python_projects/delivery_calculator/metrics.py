@@ -0,0 +1,137 @@
+# Importing the necessary libraries
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from time import perf_counter
+
+# Upper edges of the latency buckets in seconds (1-2.5-5 steps from 1 microsecond to 10 seconds)
+BUCKETS = tuple(round(base * 10.0**exponent, 12) for exponent in range(-6, 1) for base in (1, 2.5, 5)) + (10.0,)
+
+# Percentiles reported next to the histograms
+QUANTILES = (0.5, 0.9, 0.99)
+
+# A latency histogram with fixed buckets (the same kind Prometheus uses)
+class Histogram:
+  def __init__(self, buckets: tuple = BUCKETS):
+    self.buckets = buckets
+    self.counts = [0] * (len(buckets) + 1) # Last bucket is everything above the largest edge
+    self.sum = 0.0
+    self.count = 0
+
+  def observe(self, seconds: float):
+    """Adds one measurement to the histogram"""
+    self.counts[bisect_left(self.buckets, seconds)] += 1
+    self.sum += seconds
+    self.count += 1
+
+  def quantile(self, q: float) -> float:
+    """Estimates a quantile by interpolating inside the bucket it falls in"""
+    if self.count == 0:
+      return float("nan")
+    rank = q * self.count
+    seen = 0
+    for index, count in enumerate(self.counts):
+      if seen + count >= rank and count > 0:
+        if index == len(self.buckets): # Above the largest edge, nothing better to report
+          return self.buckets[-1]
+        lower = self.buckets[index - 1] if index > 0 else 0.0
+        return lower + (self.buckets[index] - lower) * (rank - seen) / count
+      seen += count
+    return self.buckets[-1]
+
+# Does nothing, so that the resources don't need to check if metrics are switched on
+class NullTimer:
+  def lap(self, stage: str):
+    pass
+
+  def finish(self, status: int):
+    pass
+
+NULL_TIMER = NullTimer()
+
+# Times the stages of one request, one lap at a time
+class StageTimer:
+  def __init__(self, metrics, endpoint: str):
+    self.metrics = metrics
+    self.endpoint = endpoint
+    self.start = self.last = perf_counter()
+    self.laps = []
+
+  def lap(self, stage: str):
+    """Records the time since the previous lap as the time spent in stage"""
+    now = perf_counter()
+    self.laps.append((stage, now - self.last))
+    self.last = now
+
+  def finish(self, status: int):
+    """Records all of the laps, the total time and the status code of the request"""
+    self.laps.append(("total", perf_counter() - self.start))
+    self.metrics.record(self.endpoint, status, self.laps)
+
+# Collects per-stage latency histograms and request/error counters for the whole process
+class Metrics:
+  def __init__(self, enabled: bool = False):
+    self.enabled = enabled
+    self.lock = threading.Lock()
+    self.histograms = defaultdict(Histogram) # (endpoint, stage) -> Histogram
+    self.requests = defaultdict(int) # (endpoint, status) -> number of requests
+    self.errors = defaultdict(int) # endpoint -> number of 4xx/5xx responses
+
+  def timer(self, endpoint: str):
+    """Returns a StageTimer for a request, or a NullTimer if metrics are switched off"""
+    return StageTimer(self, endpoint) if self.enabled else NULL_TIMER
+
+  def record(self, endpoint: str, status: int, laps: list):
+    """Adds the laps of a finished request to the histograms and counters"""
+    with self.lock:
+      for stage, seconds in laps:
+        self.histograms[(endpoint, stage)].observe(seconds)
+      self.requests[(endpoint, status)] += 1
+      if status >= 400:
+        self.errors[endpoint] += 1
+
+  def reset(self):
+    """Clears all of the histograms and counters"""
+    with self.lock:
+      self.histograms.clear()
+      self.requests.clear()
+      self.errors.clear()
+
+  def render(self, extra: dict = None) -> str:
+    """Returns all of the metrics in the Prometheus text format.
+    extra can hold more (name -> value) gauges, e.g. the fee cache counters."""
+    lines = []
+    with self.lock:
+      lines.append("# HELP delivery_requests_total Number of requests by endpoint and status code.")
+      lines.append("# TYPE delivery_requests_total counter")
+      for (endpoint, status), count in sorted(self.requests.items()):
+        lines.append(f'delivery_requests_total{{endpoint="{endpoint}",status="{status}"}} {count}')
+
+      lines.append("# HELP delivery_errors_total Number of 4xx/5xx responses by endpoint.")
+      lines.append("# TYPE delivery_errors_total counter")
+      for endpoint, count in sorted(self.errors.items()):
+        lines.append(f'delivery_errors_total{{endpoint="{endpoint}"}} {count}')
+
+      lines.append("# HELP delivery_stage_seconds Time spent in each stage of a request.")
+      lines.append("# TYPE delivery_stage_seconds histogram")
+      for (endpoint, stage), histogram in sorted(self.histograms.items()):
+        labels = f'endpoint="{endpoint}",stage="{stage}"'
+        cumulative = 0
+        for edge, count in zip(histogram.buckets, histogram.counts):
+          cumulative += count
+          lines.append(f'delivery_stage_seconds_bucket{{{labels},le="{edge:g}"}} {cumulative}')
+        lines.append(f'delivery_stage_seconds_bucket{{{labels},le="+Inf"}} {histogram.count}')
+        lines.append(f"delivery_stage_seconds_sum{{{labels}}} {histogram.sum:.9f}")
+        lines.append(f"delivery_stage_seconds_count{{{labels}}} {histogram.count}")
+
+      lines.append("# HELP delivery_stage_seconds_quantile Estimated percentiles of the stage times.")
+      lines.append("# TYPE delivery_stage_seconds_quantile gauge")
+      for (endpoint, stage), histogram in sorted(self.histograms.items()):
+        for q in QUANTILES:
+          lines.append(f'delivery_stage_seconds_quantile{{endpoint="{endpoint}",stage="{stage}",quantile="{q}"}} '
+                       f"{histogram.quantile(q):.9f}")
+
+    for name, value in (extra or {}).items():
+      lines.append(f"# TYPE {name} gauge")
+      lines.append(f"{name} {value}")
+    return "\n".join(lines) + "\n"
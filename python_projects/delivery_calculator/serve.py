@@ -0,0 +1,75 @@
+# Importing the necessary libraries
+import argparse
+import os
+
+# Production entry point for the delivery calculator
+# Serves the same API as calculator.py, but from a pool of worker processes/threads instead of
+# the single-process Flask development server. Three servers are supported:
+# - gunicorn: WSGI app (calculator.py) with --workers processes and --threads threads each (Linux/macOS)
+# - waitress: WSGI app (calculator.py) with --threads threads in one process (also works on Windows)
+# - uvicorn: ASGI app (asgi.py) with --workers processes running an asyncio event loop each
+
+def serve_gunicorn(host:str, port:int, workers:int, threads:int) -> None:
+  """This function serves the Flask app with gunicorn."""
+  from gunicorn.app.base import BaseApplication
+  from calculator import app
+
+  class DeliveryApplication(BaseApplication):
+    def load_config(self):
+      self.cfg.set("bind", f"{host}:{port}")
+      self.cfg.set("workers", workers)
+      self.cfg.set("threads", threads)
+
+    def load(self):
+      return app
+
+  DeliveryApplication().run()
+
+def serve_waitress(host:str, port:int, workers:int, threads:int) -> None:
+  """This function serves the Flask app with waitress (threads only)."""
+  from waitress import serve
+  from calculator import app
+
+  if workers > 1:
+    print("waitress only runs one process, so --workers is ignored.")
+  serve(app, host=host, port=port, threads=threads)
+
+def serve_uvicorn(host:str, port:int, workers:int, threads:int) -> None:
+  """This function serves the asyncio/ASGI version of the API with uvicorn."""
+  import socket
+  import sys
+  import uvicorn
+  from uvicorn.supervisors import Multiprocess
+
+  sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+  config = uvicorn.Config("asgi:app", host=host, port=port, workers=workers, log_level="warning")
+  if workers == 1:
+    uvicorn.Server(config).run()
+    return
+
+  # uvicorn's own shared socket is created without IPPROTO_TCP, so asyncio never switches on TCP_NODELAY
+  # for its connections and every small response waits ~40ms for a delayed ACK. Binding it here avoids that.
+  sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP)
+  sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+  sock.bind((host, port))
+  sock.set_inheritable(True)
+  Multiprocess(config, sockets=[sock]).run()
+
+# Servers that can be chosen from the command line
+SERVERS = {"gunicorn": serve_gunicorn, "waitress": serve_waitress, "uvicorn": serve_uvicorn}
+
+def main(argv=None) -> None:
+  """This function starts the chosen server from the command line."""
+  parser = argparse.ArgumentParser(description="Serve the delivery calculator API in production.")
+  parser.add_argument("--server", choices=SERVERS, default="gunicorn" if os.name != "nt" else "waitress",
+                      help="server to run (gunicorn and waitress serve calculator.py, uvicorn serves asgi.py)")
+  parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+  parser.add_argument("--port", type=int, default=5000, help="port to listen on")
+  parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="number of worker processes")
+  parser.add_argument("--threads", type=int, default=4, help="number of threads per worker")
+  args = parser.parse_args(argv)
+
+  SERVERS[args.server](args.host, args.port, args.workers, args.threads)
+
+if __name__ == "__main__":
+  main()
@@ -1,6 +1,15 @@
+import asyncio
+import io
+import json
+import time
 import unittest
 from datetime import datetime
-from calculator import calculate_delivery_fee, check_values
+from calculator import app, calculate_delivery_fee, calculate_delivery_fees, check_values, metrics
+import asgi
+from benchmark import build_requests, parse_mix, run_benchmark, flask_client_sender
+from bulk_calculator import process_orders
+from fee_cache import FeeCache
+from validator import parse_time, validate_order
 
 # Performing unit testing to prevent future bugs and ensure functions work correctly
 class TestCalculator(unittest.TestCase):
@@ -14,3 +23,141 @@ class TestCalculator(unittest.TestCase):
     """This function tests the check_values function."""
     result = check_values(790, 2235, 4, '2024-01-15T13:00:00Z')
     self.assertEqual(result, (790, 2235, 4, datetime(2024, 1, 15, 13, 0)))
+
+  def test_calculate_delivery_fees(self):
+    """This function tests that the batch calculation matches calculate_delivery_fee for every order."""
+    orders = [(cart_value, delivery_dist, num_items, time)
+              for cart_value in [1, 790, 999, 1000, 5000, 19999, 20000]
+              for delivery_dist in [1, 1000, 1001, 1499, 1500, 2235, 10000]
+              for num_items in [1, 4, 5, 12, 13, 30]
+              for time in [datetime(2024, 1, 15, 13, 0), datetime(2024, 1, 19, 14, 59, 59),
+                           datetime(2024, 1, 19, 15, 0), datetime(2024, 1, 19, 18, 59, 59),
+                           datetime(2024, 1, 19, 19, 0)]]
+    expected = [calculate_delivery_fee(*order)["delivery_fee"] for order in orders]
+    result = calculate_delivery_fees(*zip(*orders))
+    self.assertEqual(result.tolist(), expected)
+
+  def test_batch_endpoint(self):
+    """This function tests the /delivery/batch endpoint."""
+    orders = [{"cart_value": 790, "delivery_distance": 2235, "number_of_items": 4, "time": "2024-01-15T13:00:00Z"},
+              {"cart_value": 790, "delivery_distance": 2235, "number_of_items": 13, "time": "2024-01-19T16:00:00Z"}]
+    response = app.test_client().post("/delivery/batch", json={"orders": orders})
+    self.assertEqual(response.get_json(), {"delivery_fees": [710, 1500]})
+
+  def test_process_orders(self):
+    """This function tests the streaming bulk calculator on a small NDJSON file."""
+    infile = io.StringIO("\n".join([
+      '{"cart_value": 790, "delivery_distance": 2235, "number_of_items": 4, "time": "2024-01-15T13:00:00Z"}',
+      '{"cart_value": -1, "delivery_distance": 2235, "number_of_items": 4, "time": "2024-01-15T13:00:00Z"}',
+      '{"cart_value": 790, "delivery_distance": 2235, "number_of_items": 13, "time": "2024-01-19T16:00:00Z"}',
+      'not json',
+      '{"cart_value": -1, "delivery_distance": -1, "number_of_items": 0, "time": "2024-01-15 13:00"}'
+    ]))
+    outfile = io.StringIO()
+    summary = process_orders(infile, outfile, chunk_size=2)
+    fees = [json.loads(line)["delivery_fee"] for line in outfile.getvalue().splitlines()]
+    self.assertEqual(fees, [710, 1500])
+    self.assertEqual((summary["rows"], summary["priced"], summary["rejected"]), (5, 2, 3))
+    self.assertEqual(summary["rejected_by_reason"]["Invalid JSON."], 1)
+    # A row with several bad fields is counted once
+    self.assertEqual(sum(summary["rejected_by_reason"].values()), summary["rejected"])
+
+  def test_fee_cache(self):
+    """This function tests that the fee cache gives the same fees and counts hits, misses and evictions."""
+    now = [0.0]
+    cache = FeeCache(calculate_delivery_fee, maxsize=2, ttl=60, timer=lambda: now[0])
+    monday = datetime(2024, 1, 15, 13, 0)
+    friday = datetime(2024, 1, 19, 16, 0)
+    for order in [(790, 2235, 4, monday), (790, 2400, 2, monday), (5000, 1000, 13, friday),
+                  (790, 2235, 4, monday), (790, 2235, 13, friday)]:
+      self.assertEqual(cache.get_fee(*order), calculate_delivery_fee(*order))
+    stats = cache.stats()
+    self.assertEqual((stats["hits"], stats["misses"], stats["evictions"]), (2, 3, 1))
+
+    # Quotes expire after the time-to-live
+    now[0] = 61.0
+    cache.get_fee(790, 2235, 13, friday)
+    stats = cache.stats()
+    self.assertEqual((stats["misses"], stats["evictions"]), (4, 2))
+
+  def test_parse_time(self):
+    """This function tests the fast time parser against strptime."""
+    self.assertEqual(parse_time("2024-01-15T13:00:00Z"), datetime.strptime("2024-01-15T13:00:00Z", "%Y-%m-%dT%H:%M:%SZ"))
+    self.assertEqual(parse_time("2024-02-29T23:59:59Z"), datetime(2024, 2, 29, 23, 59, 59))
+    for value in ["2023-02-29T12:00:00Z", "2024-13-01T12:00:00Z", "2024-01-15T24:00:00Z",
+                  "2024-01-15 13:00:00Z", "2024-01-15T13:00:00", "0000-01-01T00:00:00Z", None, 20240115]:
+      self.assertIsNone(parse_time(value))
+
+  def test_validate_order(self):
+    """This function tests that validate_order collects every error at once."""
+    order, errors = validate_order({"cart_value": 790, "delivery_distance": 2235, "number_of_items": 4, "time": "2024-01-15T13:00:00Z"})
+    self.assertEqual((order, errors), ((790, 2235, 4, datetime(2024, 1, 15, 13, 0)), []))
+    order, errors = validate_order({"cart_value": "790", "delivery_distance": 0, "number_of_items": True})
+    self.assertIsNone(order)
+    self.assertEqual([error["field"] for error in errors], ["cart_value", "delivery_distance", "number_of_items", "time"])
+
+  def test_invalid_payload_returns_400(self):
+    """This function tests that malformed requests get a structured 400 response."""
+    client = app.test_client()
+    response = client.post("/delivery", json={"cart_value": 790, "delivery_distance": 2235, "number_of_items": 4, "time": "tomorrow"})
+    self.assertEqual(response.status_code, 400)
+    self.assertEqual(response.get_json()["errors"][0]["field"], "time")
+    response = client.post("/delivery", data="not json", content_type="application/json")
+    self.assertEqual(response.status_code, 400)
+    response = client.post("/delivery/batch", json={"orders": [{"cart_value": 790}]})
+    self.assertEqual(response.status_code, 400)
+    self.assertEqual(response.get_json()["errors"][0]["index"], 0)
+
+  def test_asgi_app(self):
+    """This function tests the ASGI version of the /delivery endpoint without starting a server."""
+    body = json.dumps({"cart_value": 790, "delivery_distance": 2235, "number_of_items": 13, "time": "2024-01-19T16:00:00Z"}).encode()
+    messages = []
+
+    async def receive():
+      return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+      messages.append(message)
+
+    asyncio.run(asgi.app({"type": "http", "method": "POST", "path": "/delivery"}, receive, send))
+    self.assertEqual(messages[0]["status"], 200)
+    self.assertEqual(json.loads(messages[1]["body"]), {"delivery_fee": 1500})
+
+  def test_metrics_endpoint(self):
+    """This function tests that /metrics reports the stage timings and counters when switched on."""
+    client = app.test_client()
+    metrics.enabled = True
+    try:
+      client.post("/delivery", json={"cart_value": 790, "delivery_distance": 2235, "number_of_items": 4, "time": "2024-01-15T13:00:00Z"})
+      client.post("/delivery", json={"cart_value": 790})
+      text = client.get("/metrics").get_data(as_text=True)
+    finally:
+      metrics.enabled = False
+      metrics.reset()
+    self.assertIn('delivery_requests_total{endpoint="/delivery",status="200"} 1', text)
+    self.assertIn('delivery_errors_total{endpoint="/delivery"} 1', text)
+    for stage in ["parse", "validate", "calculate", "serialize", "total"]:
+      self.assertIn(f'delivery_stage_seconds_count{{endpoint="/delivery",stage="{stage}"}}', text)
+    self.assertIn('quantile="0.99"', text)
+
+  def test_benchmark_inprocess(self):
+    """This function tests a small in-process benchmark run with every payload in the mix."""
+    mix = parse_mix("valid=1,invalid=1,rush-hour=1,max-cap=1")
+    results = run_benchmark(flask_client_sender, build_requests(mix, 40), concurrency=2, warmup=0)
+    self.assertEqual(results["requests"], 40)
+    self.assertEqual(set(results["statuses"]), {"200", "400"})
+    self.assertLessEqual(results["latency_ms"]["p50"], results["latency_ms"]["p99"])
+
+  def test_benchmark_warmup_untimed(self):
+    """This function tests that the warmup requests are sent before the clock starts."""
+    def slow_warmup_sender():
+      calls = []
+      def send(body):
+        calls.append(body)
+        if len(calls) <= 5:
+          time.sleep(0.05) # Only the warmup requests are slow
+        return 200
+      return send
+    results = run_benchmark(slow_warmup_sender, build_requests(parse_mix("valid=1"), 20), concurrency=2, warmup=5)
+    self.assertEqual(results["requests"], 20)
+    self.assertLess(results["seconds"], 0.2)
@@ -0,0 +1,77 @@
+# Importing the necessary libraries
+import re
+from datetime import datetime
+
+# Fields that must be positive integers (names used in the request payload) and their error messages
+INTEGER_FIELDS = tuple((field, f"{field} must be a positive integer.")
+                       for field in ("cart_value", "delivery_distance", "number_of_items"))
+TIME_MESSAGE = "Invalid time format. Use YYYY-MM-DDTHH:MM:SSZ."
+
+# The only accepted time format is YYYY-MM-DDTHH:MM:SSZ
+TIME_PATTERN = re.compile(r"\d{4}-\d\d-\d\dT\d\d:\d\d:\d\dZ", re.ASCII)
+
+# Number of days in each month (index 0 is unused, February is fixed up for leap years)
+DAYS_IN_MONTH = (0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+def parse_time(value) -> datetime:
+  """This function parses a YYYY-MM-DDTHH:MM:SSZ timestamp without strptime.
+  Returns a datetime object, or None if the value is not a valid timestamp."""
+  if type(value) is not str or TIME_PATTERN.fullmatch(value) is None:
+    return None
+  year = int(value[0:4])
+  month = int(value[5:7])
+  day = int(value[8:10])
+  hour = int(value[11:13])
+  minute = int(value[14:16])
+  second = int(value[17:19])
+
+  # Checking the calendar by hand so that datetime never has to raise
+  if year < 1 or not 1 <= month <= 12 or hour > 23 or minute > 59 or second > 59:
+    return None
+  leap = month == 2 and year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+  if not 1 <= day <= DAYS_IN_MONTH[month] + leap:
+    return None
+  return datetime(year, month, day, hour, minute, second)
+
+def validate_order(delivery_info) -> tuple:
+  """This function checks a /delivery payload and collects every error in one pass.
+  Returns ((cart_value, delivery_dist, num_items, time), []) if there are no errors,
+  otherwise (None, errors) where each error names the field and what is wrong with it."""
+  if type(delivery_info) is not dict:
+    return None, [{"field": None, "message": "Request payload must be a JSON object."}]
+
+  errors = []
+  values = []
+  for field, message in INTEGER_FIELDS:
+    value = delivery_info.get(field)
+    if type(value) is not int or value <= 0:
+      errors.append({"field": field, "message": message})
+    values.append(value)
+
+  time = parse_time(delivery_info.get("time"))
+  if time is None:
+    errors.append({"field": "time", "message": TIME_MESSAGE})
+
+  if errors:
+    return None, errors
+  return (values[0], values[1], values[2], time), errors
+
+def validate_orders(orders) -> tuple:
+  """This function checks a list of /delivery payloads, e.g. for the batch endpoint.
+  Returns (list of checked orders, []) if there are no errors,
+  otherwise (None, errors) where each error also has the index of the order."""
+  if type(orders) is not list:
+    return None, [{"index": None, "field": "orders", "message": "orders must be a list."}]
+
+  checked = []
+  errors = []
+  for index, delivery_info in enumerate(orders):
+    order, order_errors = validate_order(delivery_info)
+    if order_errors:
+      errors.extend({"index": index, **error} for error in order_errors)
+    else:
+      checked.append(order)
+
+  if errors:
+    return None, errors
+  return checked, errors
@@ -1,36 +1,23 @@
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy.optimize import minimize
+import argparse
+import json
 
-# Initialize arrays
-sample_size = 10000
-r = np.zeros(sample_size)
-E = np.zeros(sample_size)
+def generate_energies(sample_size=10000, E_s=25, gamma_s=5, seed=None):
+    """Generates sample_size energies E(r) (seed is for np.random, None for a different run every time)"""
+    if seed is not None:
+        np.random.seed(seed)
+    r = np.random.randn(sample_size)  # r values will be uniformly distributed random numbers betweeen 0 and 1
+    return (gamma_s / 2) * np.tan(np.pi * (r - 0.5)) + E_s  # this is a function E(r) which gives the probability distribution function
 
-start = 0
-end = 50
-step = 0.1
-x = np.arange(start, end, step)  # generating values for x
-
-E_s = 25  # mean energy of an unstable state
-gamma_s = 5  # uncertainty on the mean energy, E_s
-
-# Generate random numbers and calculate the energy E
-for i in range(sample_size):
-    r[i] = np.random.randn()  # r values will be uniformly distributed random numbers betweeen 0 and 1
-    E[i] = (gamma_s / 2) * np.tan(np.pi * (r[i] - 0.5)) + E_s  # this is a function E(r) which gives the probability distribution function
-
-# Histogram calculation
-a, _ = np.histogram(E, bins=np.arange(start, end + step, step))
-
-# Fitting x and y data to a Gaussian curve
-E_fitted = x[(x >= 21) & (x <= 29)]
-y_fitted = a[(x >= 21) & (x <= 29)]  
-y_fitted = (y_fitted - np.min(y_fitted)) / (np.max(y_fitted) - np.min(y_fitted)) / 0.08 # normalizing y_fitted
+def histogram(E, start=0, end=50, step=0.1):
+    """Returns the bin starts x and the counts a of the histogram of E"""
+    x = np.arange(start, end, step)  # generating values for x
+    a, _ = np.histogram(E, bins=np.arange(start, end + step, step))
+    return x, a
 
 # Define Gaussian distribution function
-def gaussian(x, mu, sigma):
-    return 1 / (sigma * np.sqrt(2 * np.pi)) * np.exp(-(x - mu) ** 2 / (2 * sigma ** 2)) * np.sum(y_fitted)
+def gaussian(x, mu, sigma, scale):
+    return 1 / (sigma * np.sqrt(2 * np.pi)) * np.exp(-(x - mu) ** 2 / (2 * sigma ** 2)) * scale
 
 # Want to minimize the loss (negative log-likelihood) to find optimal values for mu and sigma
 def loss(params, x, y):
@@ -38,28 +25,74 @@ def loss(params, x, y):
     if sigma == 0:
         return float('inf') # avoiding a divide-by-zero error
     else:
-        y_pred = gaussian(x, mu, sigma) # predicted values
+        y_pred = gaussian(x, mu, sigma, np.sum(y)) # predicted values
         return -np.sum(np.log1p(y_pred) * y)
 
-# Initial guesses for the parameters
-initial_guess = [25, 1]
+def fit_gaussian(x, a, low=21, high=29, initial_guess=(25, 1)):
+    """Fits a Gaussian curve to the histogram between low and high; Returns mu, sigma and the scale of the curve"""
+    from scipy.optimize import minimize
+
+    # Fitting x and y data to a Gaussian curve
+    E_fitted = x[(x >= low) & (x <= high)]
+    y_fitted = a[(x >= low) & (x <= high)]
+    y_fitted = (y_fitted - np.min(y_fitted)) / (np.max(y_fitted) - np.min(y_fitted)) / 0.08 # normalizing y_fitted
+
+    # Perform optimization with the minimization function
+    optim_result = minimize(loss, list(initial_guess), args=(E_fitted, y_fitted))
 
-# Perform optimization with the minimization function
-optim_result = minimize(loss, initial_guess, args=(E_fitted, y_fitted))
+    # Extract the optimal mu and sigma parameters
+    mu_opt, sigma_opt = optim_result.x
+    return mu_opt, sigma_opt, np.sum(y_fitted)
+
+def plot(x, a, mu_opt, sigma_opt, scale, output=None):
+    """Plots the histogram with the fitted Gaussian curve; the figure is saved to output or shown if output is None"""
+    import matplotlib.pyplot as plt
+
+    # Plot the histogram of the data
+    plt.figure(figsize=(12, 6))
+    plt.bar(x, a, width=0.1)
+
+    # Plot fitted Gaussian curve
+    plt.plot(x, gaussian(x, mu_opt, sigma_opt, scale), label='Gaussian fitted curve', c="r")
+    plt.legend()
+    plt.xlabel('E')
+    plt.ylabel('dN/dE')
+
+    plt.title('Breit-Wigner distribution')
+    if output:
+        plt.savefig(output)
+        plt.close()
+    else:
+        plt.show() # Displays the figures together
 
-# Extract the optimal mu and sigma parameters
-mu_opt, sigma_opt = optim_result.x
-#print(mu_opt, sigma_opt) # If you want to know the values for mu and sigma optimized
+def main(argv=None):
+    """Generates the energies, fits the Gaussian and plots the result; --output saves the figure instead of
+    showing it, --no-plot skips it, and --json writes the fitted values"""
+    parser = argparse.ArgumentParser(description="Fit a Gaussian to the center of a Breit-Wigner distribution.")
+    parser.add_argument("--samples", type=int, default=10000, help="number of energies")
+    parser.add_argument("--E-s", type=float, default=25, help="mean energy of the unstable state")
+    parser.add_argument("--gamma-s", type=float, default=5, help="uncertainty on the mean energy")
+    parser.add_argument("--seed", type=int, help="seed for np.random")
+    parser.add_argument("--output", help="save the figure to this file instead of showing it")
+    parser.add_argument("--no-plot", action="store_true", help="don't make the figure")
+    parser.add_argument("--json", help="write the results to this file (- for stdout)")
+    args = parser.parse_args(argv)
 
-# Plot the histogram of the data
-plt.figure(figsize=(12, 6))
-plt.bar(x, a, width=0.1)
+    E = generate_energies(args.samples, args.E_s, args.gamma_s, args.seed)
+    x, a = histogram(E)
+    mu_opt, sigma_opt, scale = fit_gaussian(x, a)
+    #print(mu_opt, sigma_opt) # If you want to know the values for mu and sigma optimized
+    results = {"samples": args.samples, "E_s": args.E_s, "gamma_s": args.gamma_s, "seed": args.seed,
+               "mu": float(mu_opt), "sigma": float(sigma_opt)}
 
-# Plot fitted Gaussian curve
-plt.plot(x, gaussian(x, mu_opt, sigma_opt), label='Gaussian fitted curve', c="r")
-plt.legend()
-plt.xlabel('E')
-plt.ylabel('dN/dE')
+    if not args.no_plot:
+        plot(x, a, mu_opt, sigma_opt, scale, args.output)
+    if args.json == "-":
+        print(json.dumps(results, indent=2))
+    elif args.json:
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=2)
+    return results
 
-plt.title('Breit-Wigner distribution')
-plt.show() # Displays the figures together
+if __name__ == "__main__":
+    main()
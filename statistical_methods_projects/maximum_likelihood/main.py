@@ -1,14 +1,14 @@
 # Importing the necessary functions
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy.optimize import fmin
-from scipy.optimize import minimize
+import argparse
+import json
+import os
 from math import pi
 
 def log_likelihood(x: list[float]) -> float:
     """Function defining the log-likelihood function.
     Returns: Negative log-likelihood : float"""
-    
+
     # Defining constants and input arrays
     z = np.array([0, 6, 12, 18]) * 10**-6 # Heights where the clusters are observed
     n = np.array([1880, 940, 530, 305]) # Number of clusters observed for each height
@@ -18,75 +18,153 @@ def log_likelihood(x: list[float]) -> float:
     delta_rho = 1063 - 998 # Density difference between mastic and water
     g = 9.80 # Gravitational acceleration
     T = 293 # Absolute temperature in Kelvin
-    
+
     # Calculates and returns the negative log-likelihood
     return -np.sum(n * (np.log(nu_0) - (4 * pi * r**3 * delta_rho * g * z) / (3 * k * T)) - nu_0 * np.exp((-4 * pi * r**3 * delta_rho * g * z) / (3 * k * T)))
 
-# Defining initial values/guesses for the parameters
-nu_0 = 1880 # Number of clusters observed at z=0
-k = np.arange(1, 2.0005, 0.0005) * 10**-23 # Initial guesses for the Boltzmann constant
-f = np.zeros(k.shape) # Will store the values of the negative log-likelihood function 
-max_logL = -9999 # Initialized with a very large negative value
-best_k = 9999  # Initialized with a very large positive value
-best_i = 0 # Keeps track of the index corresponding to the best value of k
-
-# Loop over k values to find the one that maximizes the log-likelihood
-for i in range(len(k)):
-    f[i] = -log_likelihood([nu_0, k[i]])
-    if f[i] > max_logL:
-        max_logL = f[i]
-        best_k = k[i] # Best value for k is found in here
-        best_i = i
-
-# Calculates the uncertainty in k
-uncertainty_m = k[np.where(f > (max_logL - 0.5))[0][0]]
-uncertainty_p = k[np.where(f > (max_logL - 0.5))[0][-1]]
-
-# Plotting the parameter estimation
-plt.plot(k, f, '.', c="purple")
-plt.title('Log likelihood parameter estimation')
-plt.xlabel('Boltzmann constant, k [J/k]')
-plt.ylabel('Log likelihood')
-plt.show()
-
-# Printing the results for part 1
-print("\nPart 1:\n")
-print(f"k: {best_k}")
-print(f"Uncertainty of k: {(uncertainty_p - uncertainty_m) / 2}")
-
-# Uses scipy's fmin function to find the minimum of the log-likelihood function
-x, val = fmin(lambda x: log_likelihood(x), [nu_0, best_k], full_output=True)[:2]
-
-# Defines a range of values for nu and k
-theta_nu = np.arange(1800, 1890.01, 0.1)
-theta_k = np.arange(1.15 * 10**-23, 1.35 * 10**-23, 0.01 * 10**-23)
-
-# Initializes a matrix to store the log-likelihood for each combination of nu and k
-likelihood_matrix = np.zeros((len(theta_nu), len(theta_k)))
-for i in range(len(theta_nu)):
-    for j in range(len(theta_k)):
-        likelihood_matrix[i, j] = -log_likelihood([theta_nu[i], theta_k[j]])
-
-# Determine which values of nu and k result in a log-likelihood within 0.5 of the max
-uncertainty_matrix = likelihood_matrix >= (-val - 0.5)
-
-# Plot the parameter estimation of k
-plt.contour(theta_k, theta_nu, uncertainty_matrix)
-plt.plot(x[1], x[0], '+')
-plt.title('Parameter estimation with 1$\sigma$ confidence')
-plt.xlabel('Boltzmann constant, k [J/k]')
-plt.ylabel('nu_0')
-plt.show()
-
-# Prints the results for part 2
-print("\nPart 2:\n")
-print(f"k: {x[1]}")
-print(f"nu_0: {x[0]:.2f}")
-print(f"Uncertainty of k: {(np.where(np.sum(uncertainty_matrix, axis=0) > 0)[0][-1] - np.where(np.sum(uncertainty_matrix, axis=0) > 0)[0][0]) * 0.001 * 10**-23 / 2}")
-print(f"Uncertainty of nu_0: {(np.where(np.sum(uncertainty_matrix, axis=1) > 0)[0][-1] - np.where(np.sum(uncertainty_matrix, axis=1) > 0)[0][0]) * 0.01 / 2}")
-
-# Prints the results for part iii
-# Calculates Avogadro's constant and its uncertainty
-print("\nPart 3:\n")
-print(f"Estimating Avogadro's constant: {8.314 / x[1]}")
-print(f"Uncertainty of Avogadro's constant, N_A: {8.314 * (np.where(np.sum(uncertainty_matrix, axis=0) > 0)[0][-1] - np.where(np.sum(uncertainty_matrix, axis=0) > 0)[0][0]) * 0.001 * 10**-23 / 2 / (x[1]**2)}")
+def part_1(nu_0: float = 1880) -> dict:
+    """Scans k with nu_0 fixed (nu_0 = number of clusters observed at z=0).
+    Returns: The k values, their log-likelihoods, the best k and its uncertainty : dict"""
+    k = np.arange(1, 2.0005, 0.0005) * 10**-23 # Initial guesses for the Boltzmann constant
+    f = np.zeros(k.shape) # Will store the values of the negative log-likelihood function
+    max_logL = -9999 # Initialized with a very large negative value
+    best_k = 9999  # Initialized with a very large positive value
+    best_i = 0 # Keeps track of the index corresponding to the best value of k
+
+    # Loop over k values to find the one that maximizes the log-likelihood
+    for i in range(len(k)):
+        f[i] = -log_likelihood([nu_0, k[i]])
+        if f[i] > max_logL:
+            max_logL = f[i]
+            best_k = k[i] # Best value for k is found in here
+            best_i = i
+
+    # Calculates the uncertainty in k
+    uncertainty_m = k[np.where(f > (max_logL - 0.5))[0][0]]
+    uncertainty_p = k[np.where(f > (max_logL - 0.5))[0][-1]]
+    return {"k_values": k, "log_likelihood": f, "k": best_k, "k_uncertainty": (uncertainty_p - uncertainty_m) / 2}
+
+def part_2(nu_0: float, best_k: float, disp: bool = True) -> dict:
+    """Fits nu_0 and k together, starting from nu_0 and best_k, and maps the 1 sigma region
+    (disp = False keeps fmin from printing its convergence messages).
+    Returns: The fit, the grid of nu_0 and k values, the 1 sigma region and the uncertainties : dict"""
+    from scipy.optimize import fmin
+
+    # Uses scipy's fmin function to find the minimum of the log-likelihood function
+    x, val = fmin(lambda x: log_likelihood(x), [nu_0, best_k], full_output=True, disp=disp)[:2]
+
+    # Defines a range of values for nu and k
+    theta_nu = np.arange(1800, 1890.01, 0.1)
+    theta_k = np.arange(1.15 * 10**-23, 1.35 * 10**-23, 0.01 * 10**-23)
+
+    # Initializes a matrix to store the log-likelihood for each combination of nu and k
+    likelihood_matrix = np.zeros((len(theta_nu), len(theta_k)))
+    for i in range(len(theta_nu)):
+        for j in range(len(theta_k)):
+            likelihood_matrix[i, j] = -log_likelihood([theta_nu[i], theta_k[j]])
+
+    # Determine which values of nu and k result in a log-likelihood within 0.5 of the max
+    uncertainty_matrix = likelihood_matrix >= (-val - 0.5)
+    k_inside = np.where(np.sum(uncertainty_matrix, axis=0) > 0)[0]
+    nu_inside = np.where(np.sum(uncertainty_matrix, axis=1) > 0)[0]
+    return {
+        "x": x, "theta_nu": theta_nu, "theta_k": theta_k, "uncertainty_matrix": uncertainty_matrix,
+        "k": x[1], "nu_0": x[0],
+        "k_uncertainty": (k_inside[-1] - k_inside[0]) * 0.001 * 10**-23 / 2,
+        "nu_0_uncertainty": (nu_inside[-1] - nu_inside[0]) * 0.01 / 2
+    }
+
+def part_3(k: float, k_uncertainty: float) -> dict:
+    """Calculates Avogadro's constant and its uncertainty from k.
+    Returns: N_A and its uncertainty : dict"""
+    return {"N_A": 8.314 / k, "N_A_uncertainty": 8.314 * k_uncertainty / (k**2)}
+
+def plot_part_1(result: dict) -> None:
+    """Plots the log-likelihood of every k from part 1."""
+    import matplotlib.pyplot as plt
+
+    # Plotting the parameter estimation
+    plt.plot(result["k_values"], result["log_likelihood"], '.', c="purple")
+    plt.title('Log likelihood parameter estimation')
+    plt.xlabel('Boltzmann constant, k [J/k]')
+    plt.ylabel('Log likelihood')
+
+def plot_part_2(result: dict) -> None:
+    """Plots the 1 sigma region of nu_0 and k from part 2."""
+    import matplotlib.pyplot as plt
+
+    # Plot the parameter estimation of k
+    plt.contour(result["theta_k"], result["theta_nu"], result["uncertainty_matrix"])
+    plt.plot(result["x"][1], result["x"][0], '+')
+    plt.title('Parameter estimation with 1$\\sigma$ confidence')
+    plt.xlabel('Boltzmann constant, k [J/k]')
+    plt.ylabel('nu_0')
+
+def main(argv=None) -> dict:
+    """Runs all three parts; --output-dir saves the figures there instead of showing them, --no-plot skips them
+    and --json writes the numeric results.
+    Returns: The numeric results : dict"""
+    parser = argparse.ArgumentParser(description="Estimate the Boltzmann and Avogadro constants with maximum likelihood.")
+    parser.add_argument("--output-dir", help="save the figures as Figure_1.png and Figure_2.png in this directory instead of showing them")
+    parser.add_argument("--no-plot", action="store_true", help="don't make the figures")
+    parser.add_argument("--json", help="write the results to this file (- for stdout)")
+    parser.add_argument("--quiet", action="store_true", help="don't print the results")
+    args = parser.parse_args(argv)
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    def show(name: str) -> None:
+        """Saves the figure just made as name in --output-dir, or shows it"""
+        import matplotlib.pyplot as plt
+        if args.output_dir:
+            plt.savefig(os.path.join(args.output_dir, name))
+            plt.close()
+        else:
+            plt.show()
+
+    nu_0 = 1880 # Number of clusters observed at z=0
+    part1 = part_1(nu_0)
+    if not args.no_plot:
+        plot_part_1(part1)
+        show("Figure_1.png")
+
+    if not args.quiet:
+        # Printing the results for part 1
+        print("\nPart 1:\n")
+        print(f"k: {part1['k']}")
+        print(f"Uncertainty of k: {part1['k_uncertainty']}")
+
+    part2 = part_2(nu_0, part1["k"], disp=not args.quiet)
+    if not args.no_plot:
+        plot_part_2(part2)
+        show("Figure_2.png")
+    part3 = part_3(part2["k"], part2["k_uncertainty"])
+
+    if not args.quiet:
+        # Prints the results for part 2
+        print("\nPart 2:\n")
+        print(f"k: {part2['k']}")
+        print(f"nu_0: {part2['nu_0']:.2f}")
+        print(f"Uncertainty of k: {part2['k_uncertainty']}")
+        print(f"Uncertainty of nu_0: {part2['nu_0_uncertainty']}")
+
+        # Prints the results for part iii
+        # Calculates Avogadro's constant and its uncertainty
+        print("\nPart 3:\n")
+        print(f"Estimating Avogadro's constant: {part3['N_A']}")
+        print(f"Uncertainty of Avogadro's constant, N_A: {part3['N_A_uncertainty']}")
+
+    results = {
+        "part_1": {"k": float(part1["k"]), "k_uncertainty": float(part1["k_uncertainty"])},
+        "part_2": {name: float(part2[name]) for name in ("k", "nu_0", "k_uncertainty", "nu_0_uncertainty")},
+        "part_3": {name: float(value) for name, value in part3.items()}
+    }
+    if args.json == "-":
+        print(json.dumps(results, indent=2))
+    elif args.json:
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=2)
+    return results
+
+if __name__ == "__main__":
+    main()
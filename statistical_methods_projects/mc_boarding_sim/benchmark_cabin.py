@@ -0,0 +1,50 @@
+# Importing the necessary libraries
+import argparse
+import random
+import time
+from main import BoardingProcess
+from cabin import CabinBoardingProcess
+
+# Cabin layouts to time: (name, rows, columns, half row)
+LAYOUTS = [
+  ("narrow-body", 28, 6, True),
+  ("wide-body", 60, 9, False),
+  ("large wide-body", 100, 9, False)
+]
+
+def time_per_tick(process: BoardingProcess, num_boardings: int, seed: int = 5) -> tuple:
+  """Times num_boardings boardings (the same queues for every engine with the same seed);
+  Returns the number of microseconds per time step and the boarding times"""
+  rng = random.Random(seed)
+  seconds = ticks = 0
+  clocks = []
+  for _ in range(num_boardings):
+    passengers = process.seat_assignment(rng)
+    start = time.perf_counter()
+    clock = process.boarding_process(passengers)
+    seconds += time.perf_counter() - start
+    ticks += round(clock / process.time_step)
+    clocks.append(clock)
+  return seconds / ticks * 1e6, clocks
+
+def main(argv=None) -> None:
+  """Prints the cost of one time step of the object and cabin engines for each layout"""
+  parser = argparse.ArgumentParser(description="Time one step of the boarding simulation for several cabin sizes.")
+  parser.add_argument("--boardings", type=int, default=3, help="number of boardings per layout and engine")
+  args = parser.parse_args(argv)
+
+  print(f"{'layout':<16} {'passengers':>10} {'objects us/tick':>16} {'cabin us/tick':>14} {'speedup':>8}")
+  for name, num_rows, num_cols, half_row in LAYOUTS:
+    objects = BoardingProcess(args.boardings)
+    objects.num_rows, objects.num_cols, objects.half_row = num_rows, num_cols, half_row
+    cabin = CabinBoardingProcess(args.boardings, num_rows, num_cols, half_row)
+    num_passengers = len(cabin.seat_assignment(random.Random(0)))
+    object_tick, object_clocks = time_per_tick(objects, args.boardings)
+    cabin_tick, cabin_clocks = time_per_tick(cabin, args.boardings)
+    # Both engines got the same queues, so a speedup only means something if they also got the same boarding times
+    if object_clocks != cabin_clocks:
+      raise RuntimeError(f"The engines disagree on the {name} layout: {object_clocks} (objects) against {cabin_clocks} (cabin).")
+    print(f"{name:<16} {num_passengers:>10} {object_tick:>16.1f} {cabin_tick:>14.1f} {object_tick / cabin_tick:>7.1f}x")
+
+if __name__ == "__main__":
+  main()
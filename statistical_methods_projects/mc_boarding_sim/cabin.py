@@ -0,0 +1,110 @@
+# Importing the necessary libraries
+from main import BoardingProcess, Passenger
+
+# State of everyone in the cabin during one boarding, kept in flat preallocated arrays (one entry per passenger)
+# instead of one object per passenger, and a boolean row x column matrix of occupied seats instead of a dict of seat codes
+class CabinState:
+  def __init__(self, num_rows: int, num_cols: int, num_passengers: int):
+    self.row = [0] * num_passengers
+    self.column = [0] * num_passengers
+    self.target = [0.0] * num_passengers # Aisle position of the passenger's row
+    self.position = [0.0] * num_passengers
+    self.timer = [0.0] * num_passengers
+    self.seat_time = [0.0] * num_passengers
+    self.swap_delay = [0.0] * num_passengers
+    self.occupied = [bytearray(num_cols + 1) for _ in range(num_rows + 1)] # occupied[row][column]
+
+  def load(self, passengers: list[Passenger], delta_seats: float):
+    """Fills the arrays with a new queue of passengers and empties all of the seats"""
+    for i, passenger in enumerate(passengers):
+      self.row[i] = passenger.get_row()
+      self.column[i] = passenger.get_column()
+      self.target[i] = (passenger.get_row() - 1) * delta_seats
+      self.position[i] = passenger.get_position()
+      self.timer[i] = 0.0
+    for row in self.occupied:
+      row[:] = bytes(len(row))
+
+# Runs the same boarding rules as BoardingProcess.boarding_process on a CabinState
+# Works for any number of rows and up to 9 columns with one aisle in the middle (e.g. wide-body layouts),
+# with the same swap rule (get_blockers and swap_offset) as the other engines
+class CabinBoardingProcess(BoardingProcess):
+  def __init__(self, num_simulations: int, num_rows: int = 28, num_cols: int = 6, half_row: bool = True,
+               workers: int = 1, master_seed: int = None):
+    super().__init__(num_simulations, workers, master_seed)
+    if num_cols > 9:
+      raise ValueError("Seat numbers are 10*row + column, so there can be at most 9 columns.")
+    self.num_rows = num_rows
+    self.num_cols = num_cols
+    self.half_row = half_row
+    self.cabin = None # Reused from one boarding to the next
+
+  def get_blocker_table(self) -> list:
+    """Returns get_blockers for every column (blockers[column]), looked up once per boarding instead of once per passenger"""
+    return [()] + [tuple(self.get_blockers(column)) for column in range(1, self.num_cols + 1)]
+
+  def get_cabin(self, num_passengers: int) -> CabinState:
+    """Returns the preallocated CabinState, creating it the first time (or when the cabin has changed size)"""
+    cabin = self.cabin
+    if (cabin is None or len(cabin.row) < num_passengers or len(cabin.occupied) != self.num_rows + 1
+        or len(cabin.occupied[0]) != self.num_cols + 1):
+      self.cabin = CabinState(self.num_rows, self.num_cols, num_passengers)
+    return self.cabin
+
+  def boarding_process(self, passengers: list[Passenger]) -> float:
+    """Simulates the boarding process for a list of passengers;
+    Returns the total time taken for all passengers to board"""
+    cabin = self.get_cabin(len(passengers))
+    cabin.load(passengers, self.delta_seats)
+    # Local names for everything used in the loop
+    row, column, target, position, timer = cabin.row, cabin.column, cabin.target, cabin.position, cabin.timer
+    seat_time, swap_delay, occupied, blockers = cabin.seat_time, cabin.swap_delay, cabin.occupied, self.get_blocker_table()
+    time_step, step, delta_passengers = self.time_step, self.passenger_speed * self.time_step, self.delta_passengers
+    delay_aisle, swap_offset = self.delay_aisle, self.swap_offset
+    queue = list(range(len(passengers))) # Passengers still in the aisle, front of the queue first
+    far = float("inf") # Stands in for "no passenger ahead"
+    clock = 0
+
+    # Start boarding
+    while queue:
+      clock += time_step
+      remaining = []
+      ahead = far # Position of the passenger ahead
+      for i in queue:
+        busy = timer[i]
+        if busy > 0: # If passenger is busy, reduce timer
+          busy = timer[i] = busy - time_step
+        if busy <= 0: # If passenger is not busy
+          here = position[i]
+          if here == target[i]: # If passenger is at correct row, sit down
+            occupied[row[i]][column[i]] = True
+            seat_time[i] = clock
+            continue
+          # If passenger ahead is not within delta_passengers, move on
+          elif ahead - here - step >= delta_passengers:
+            here = position[i] = here + step
+            # Correct row found, checking if swap is needed
+            if here == target[i]:
+              seats = occupied[row[i]]
+              num_swaps = sum(seats[blocker] for blocker in blockers[column[i]])
+              offset = swap_offset(num_swaps)
+              swap_delay[i] = offset
+              timer[i] += delay_aisle + offset
+          ahead = here
+        else:
+          ahead = position[i]
+        remaining.append(i)
+      queue = remaining
+
+    # Results go back to the passengers, so they can be recorded
+    for i, passenger in enumerate(passengers):
+      passenger.position = position[i]
+      passenger.seat_time = seat_time[i]
+      passenger.swap_delay = swap_delay[i]
+    return clock
+
+if __name__ == "__main__":
+    num_simulations = 100
+
+    boarding_process = CabinBoardingProcess(num_simulations)
+    boarding_process.run_boarding_process()
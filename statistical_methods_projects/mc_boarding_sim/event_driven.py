@@ -0,0 +1,117 @@
+# Importing the necessary libraries
+from functools import lru_cache
+from heapq import heappush, heappop
+from main import BoardingProcess, Passenger
+
+# Kinds of events, in the order they are handled when they happen at the same time
+SIT_DOWN = 0 # Passenger has finished stowing and sits down, which unblocks the queue behind them
+ARRIVE = 1 # Passenger arrives at their row and starts stowing
+BLOCKED = 2 # Passenger catches up with a passenger who is standing still
+
+# States of a passenger in the aisle
+WALKING, STOWING, WAITING = 0, 1, 2
+
+@lru_cache(maxsize=None)
+def countdown_ticks(delay: float, time_step: float) -> int:
+  """Returns the number of time steps a passenger with a timer of delay stays busy in the time-stepped simulation
+  (the timer goes down by time_step every step and the passenger sits down in the first step it is no longer positive,
+  so a delay that isn't a multiple of time_step is rounded up to the next step)"""
+  ticks, timer = 0, delay
+  while True:
+    ticks += 1
+    if timer > 0:
+      timer -= time_step
+    if timer <= 0:
+      return ticks
+
+# Simulates the boarding process by jumping from one event to the next
+# Uses the same rules as BoardingProcess.boarding_process (including is_swap_needed for the delays),
+# but instead of checking every passenger every time step, only the moments when something changes are handled
+class EventDrivenBoardingProcess(BoardingProcess):
+  def boarding_process(self, passengers: list[Passenger]) -> float:
+    """Simulates the boarding process for a list of passengers;
+    Returns the total time taken for all passengers to board"""
+    num_passengers = len(passengers)
+    targets = [(passenger.get_row() - 1) * self.delta_seats for passenger in passengers]
+    state = [WALKING] * num_passengers
+    # Walking passengers are at start_position + passenger_speed * (time - start_time)
+    start_position = [passenger.get_position() for passenger in passengers]
+    start_time = [0.0] * num_passengers
+    # The queue as a linked list, so passengers can leave it without shifting everyone behind them
+    ahead = list(range(-1, num_passengers - 1))
+    behind = list(range(1, num_passengers + 1))
+    behind[-1] = -1
+    version = [0] * num_passengers # Events of an older version are out of date and skipped
+    events = []
+    seated = {}
+    clock = 0
+
+    def schedule(i: int):
+      """Schedules the next event for walking passenger i:
+      either arriving at their row, or catching up with the (standing) passenger ahead"""
+      version[i] += 1
+      stop_position, kind = targets[i], ARRIVE
+      j = ahead[i]
+      if j >= 0 and state[j] != WALKING and start_position[j] - self.delta_passengers < targets[i]:
+        stop_position, kind = start_position[j] - self.delta_passengers, BLOCKED
+      time = start_time[i] + (stop_position - start_position[i]) / self.passenger_speed
+      heappush(events, (time, kind, i, version[i]))
+
+    def stop(i: int, position: float, time: float):
+      """Stops passenger i, which may make the passenger behind them catch up"""
+      start_position[i] = position
+      start_time[i] = time
+      j = behind[i]
+      if j >= 0 and state[j] == WALKING:
+        schedule(j)
+
+    # Everyone starts walking from the gate at the same time
+    for i in range(num_passengers):
+      schedule(i)
+
+    # Start boarding
+    while events:
+      time, kind, i, event_version = heappop(events)
+      if event_version != version[i]:
+        continue
+      passenger = passengers[i]
+
+      if kind == ARRIVE: # Correct row found, checking if swap is needed
+        state[i] = STOWING
+        passenger.position = targets[i]
+        offset = self.is_swap_needed(passenger, seated)
+        passenger.swap_delay = offset
+        stowing = countdown_ticks(self.delay_aisle + offset, self.time_step) * self.time_step
+        heappush(events, (time + stowing, SIT_DOWN, i, version[i]))
+        stop(i, targets[i], time)
+
+      elif kind == BLOCKED: # Waiting behind the passenger ahead
+        state[i] = WAITING
+        stop(i, start_position[ahead[i]] - self.delta_passengers, time)
+        passenger.position = start_position[i]
+
+      else: # Sit down and leave the queue
+        seated[passenger.get_seat()] = True
+        passenger.seat_time = clock = time
+        j = behind[i]
+        if ahead[i] >= 0:
+          behind[ahead[i]] = j
+        if j >= 0:
+          ahead[j] = ahead[i]
+
+        # Everyone waiting directly behind starts walking again. In the time-stepped simulation the
+        # passenger behind moves in the same time step as this one sits down, i.e. one step earlier.
+        while j >= 0 and state[j] == WAITING:
+          state[j] = WALKING
+          start_time[j] = time - self.time_step
+          schedule(j)
+          j = behind[j]
+        if j >= 0 and state[j] == WALKING:
+          schedule(j) # Was going to catch up with someone who is walking again
+    return clock
+
+if __name__ == "__main__":
+    num_simulations = 100
+
+    boarding_process = EventDrivenBoardingProcess(num_simulations)
+    boarding_process.run_boarding_process()
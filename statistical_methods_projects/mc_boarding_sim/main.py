@@ -2,16 +2,25 @@
 import random
 import math
 import pandas as pd
+from parallel import boarding_results, parallel_boarding_simulation, simulation_seed
+from recorder import BoardingRecorder
+from online_stats import RunningStatistics
+from strategies import random_order
 
 # A class for creating instances of passenger objects
 # Keeps track of passenger's seat number, position, and busy status
 class Passenger:
+  # Fixed attributes instead of a __dict__ per passenger (smaller and faster to look up)
+  __slots__ = ("seat", "timer", "position", "row", "column", "seat_time", "swap_delay")
+
   def __init__(self, seat: int, position: int):
     self.seat = seat
     self.timer = 0
     self.position = position
     self.row = seat // 10
     self.column = seat % 10
+    self.seat_time = None # Time at which the passenger sat down
+    self.swap_delay = 0 # Extra delay for swapping with already-seated passengers
     
   def get_position(self) -> int:
     """Getter method that returns the current position of the passenger"""
@@ -47,7 +56,7 @@ class Passenger:
 
 # Function that simulates the boarding process and calculates the mean/variance
 class BoardingProcess():
-  def __init__(self, num_simulations: int):
+  def __init__(self, num_simulations: int, workers: int = 1, master_seed: int = None):
     # All units of time are in seconds, position in meters
     self.num_rows = 28 # Number of rows in the plane
     self.half_row = True  # First row has 3 seats only
@@ -61,6 +70,9 @@ class BoardingProcess():
     self.delay_swap = 11 # Delay for passengers swapping seats
     self.delay_double = 22 # Delay for passengers swapping seats with two already-seated passengers
     self.num_simulations = num_simulations # Number of boardings simulated
+    self.workers = workers # Number of worker processes (only used together with master_seed)
+    self.master_seed = master_seed # If set, every boarding gets its own random stream derived from this seed
+    self.boarding_order = random_order # Order in which the passengers queue up (see strategies.py)
     
     # If you would like reproducability, uncomment this
     random.seed(5) # Initialize random seed
@@ -68,19 +80,18 @@ class BoardingProcess():
     # random.seed(random_seed)
     # print(random_seed)
 
-  def seat_assignment(self) -> list[Passenger]:
-    """Assigns seats to passengers in a random order;
+  def seat_assignment(self, rng: random.Random = random) -> list[Passenger]:
+    """Assigns seats to passengers in the order given by boarding_order (using the global random generator by default);
     Returns a list of passengers with assigned seats"""
     passengers = []
     
     # Use seat numbering seat = 10*row + column
     seats = [(i + 1) * 10 + j + 1 for i in range(self.num_rows) for j in range(self.num_cols)]
-    random.shuffle(seats)
+    queue = self.boarding_order(seats, rng, self)
 
     # Assign passengers in queue (starting at gate) 
     # Distance of delta_passengers should increase every time
-    for i in range(self.num_rows * self.num_cols):
-      assigned_seat = seats.pop()
+    for i, assigned_seat in enumerate(queue):
       if (not self.half_row) or (assigned_seat < 14) or (assigned_seat > 16):
         passengers.append(Passenger(assigned_seat, self.gate - i * self.delta_passengers))
     return passengers
@@ -102,6 +113,7 @@ class BoardingProcess():
         if not passenger.is_busy(): # If passenger is not busy
           if passenger.get_position() == (passenger.get_row() - 1) * self.delta_seats: 
             seated[passenger.get_seat()] = True # If passenger is at correct row, sit down
+            passenger.seat_time = clock
             passengers.pop(passenger_index)
             continue
           # If passenger ahead is not within delta_passengers, move on
@@ -110,34 +122,39 @@ class BoardingProcess():
           # Correct row found, checking if swap is needed
           if passenger.get_position() == (passenger.get_row() - 1) * self.delta_seats:
             offset = self.is_swap_needed(passenger, seated)
+            passenger.swap_delay = offset
             passenger.set_delay(self.delay_aisle + offset)
         passenger_index += 1  
     return clock         
              
+  def get_blockers(self, column: int) -> range:
+    """Returns the columns between a seat in column and the aisle, whose passengers have to get up to let it through
+    (the aisle is between column num_cols // 2 and the next one, e.g. columns 3 and 4 for 6 columns)"""
+    aisle = self.num_cols // 2
+    return range(column + 1, aisle + 1) if column <= aisle else range(aisle + 1, column)
+
+  def swap_offset(self, num_swaps: int) -> float:
+    """Returns the delay for getting past num_swaps passengers who are already seated"""
+    if num_swaps == 0:
+      return 0
+    if num_swaps == 1:
+      return self.delay_swap # One other person already seated
+    return self.delay_double + (num_swaps - 2) * self.delay_swap # Two (or more) passengers already seated
+
   def is_swap_needed(self, passenger: Passenger, seated: dict) -> int:
     """Checks if a passenger needs to swap seats with another passenger;
-    Returns the delay time if a swap is needed"""           
-    offset = 0
-    # The numbers 1-6 refer to the columns in the plane
-    if passenger.get_column() == 2 and seated.get(10 * passenger.get_row() + 3):
-      offset = self.delay_swap
-    if passenger.get_column() == 5 and seated.get(10 * passenger.get_row() + 4):
-      offset = self.delay_swap
-    if passenger.get_column() == 1:
-      if seated.get(10 * passenger.get_row() + 2) and seated.get(10 * passenger.get_row() + 3):
-        offset = self.delay_double  # Two passengers already seated
-      elif seated.get(10 * passenger.get_row() + 2) != seated.get(10 * passenger.get_row() + 3):
-        offset = self.delay_swap  # One other person already seated
-    if passenger.get_column() == 6:
-      if seated.get(10 * passenger.get_row() + 4) and seated.get(10 * passenger.get_row() + 5):
-        offset = self.delay_double
-      elif seated.get(10 * passenger.get_row() + 4) != seated.get(10 * passenger.get_row() + 5):
-        offset = self.delay_swap
-    return offset                  
-              
+    Returns the delay time if a swap is needed"""
+    # For 6 columns: columns 2 and 5 wait for 3 and 4, and the window seats 1 and 6 for 2, 3 and 4, 5
+    num_swaps = sum(1 for column in self.get_blockers(passenger.get_column()) if seated.get(10 * passenger.get_row() + column))
+    return self.swap_offset(num_swaps)
+
   def boarding_simulation(self) -> list:
     """Simulates the boarding process for a number of times specified by num_simulations;
     Returns a list of times taken for each simulation"""
+    # Reproducible mode: independent random streams, so the work can be split over several processes
+    if self.master_seed is not None:
+      return parallel_boarding_simulation(self, self.master_seed, self.workers)
+    
     times = []
     for _ in range(self.num_simulations):
       passengers = self.seat_assignment()
@@ -146,16 +163,34 @@ class BoardingProcess():
     return times
     
   def calculate_statistics(self, times: list) -> tuple:
-    """Calculates the mean and variance of a list of times;
+    """Calculates the mean and variance of a list of times (in one pass);
     Returns the mean and variance"""
-    mean = sum(times) / self.num_simulations
-    var = sum((t - mean) ** 2 for t in times) / (self.num_simulations - 1)
-    return mean, var
+    stats = RunningStatistics()
+    for time in times:
+      stats.add(time)
+    return stats.mean, stats.variance()
+
+  def sequential_boarding_simulation(self, absolute: float = None, relative: float = None, confidence: float = 0.95,
+                                     min_simulations: int = 30, max_simulations: int = 1000000) -> RunningStatistics:
+    """Simulates one boarding at a time until the confidence interval on the mean boarding time is
+    within absolute seconds or within relative times the mean (num_simulations is not used);
+    Returns the running statistics, including how many boardings were needed"""
+    if absolute is None and relative is None:
+      raise ValueError("Give an absolute or a relative precision.")
+    stats = RunningStatistics()
+    while stats.count < max_simulations:
+      # Same random streams as boarding_simulation, so the first boardings are the same ones
+      rng = random if self.master_seed is None else random.Random(simulation_seed(self.master_seed, stats.count))
+      stats.add(self.boarding_process(self.seat_assignment(rng)))
+      if stats.count >= min_simulations and stats.precision_reached(absolute, relative, confidence):
+        break
+    return stats
 
-  def run_boarding_process(self) -> None:
-    """Runs the boarding simulation and calculates statistics;
+  def run_boarding_process(self, times: list = None) -> None:
+    """Runs the boarding simulation (unless the times are given) and calculates statistics;
     Prints the mean and standard deviation of the times taken for all simulations"""
-    times = self.boarding_simulation()
+    if times is None:
+      times = self.boarding_simulation()
     mean, var = self.calculate_statistics(times)
     if not self.half_row:
       print(f"The plane has {self.num_rows} rows with {self.num_cols} seats each.")
@@ -163,32 +198,51 @@ class BoardingProcess():
       print(f"The plane has {self.num_rows} rows with {self.num_cols} seats each, except the first row, which has only 3 seats.")
     print(f"Over {self.num_simulations} simulations, the average time for all passengers to board the plane is {mean:.1f} +- {math.sqrt(var):.1f} seconds.")
 
+  def run_sequential_boarding_process(self, absolute: float = None, relative: float = None, confidence: float = 0.95) -> None:
+    """Runs boardings until the mean boarding time is known to the requested precision;
+    Prints the mean, the confidence interval and the number of simulations it took"""
+    stats = self.sequential_boarding_simulation(absolute, relative, confidence)
+    print(f"After {stats.count} simulations, the average time for all passengers to board the plane is {stats.mean:.1f} seconds "
+          f"(+- {stats.half_width(confidence):.1f} seconds with {confidence:.0%} confidence, standard deviation {math.sqrt(stats.variance()):.1f} seconds).")
+
+  def get_config(self) -> dict:
+    """Returns the settings of the simulation (stored once per run by BoardingRecorder)"""
+    return {
+      'Num Rows': self.num_rows,
+      'Num Columns': self.num_cols,
+      'Half Row': self.half_row,
+      'Passenger Speed': self.passenger_speed,
+      'Time Step': self.time_step,
+      'Delay Aisle': self.delay_aisle,
+      'Delay Swap': self.delay_swap
+    }
+
+  def record_boarding_process(self, recorder: BoardingRecorder) -> BoardingRecorder:
+    """Runs the boarding simulation once, streaming every boarding time (and the seat times and
+    swap delays of the passengers, if the recorder keeps them) into the recorder; Returns the recorder"""
+    if self.master_seed is not None:
+      # Each boarding is recorded as soon as its chunk comes back from the workers
+      for clock, passengers in boarding_results(self, self.master_seed, self.workers, keep_passengers=recorder.passengers):
+        recorder.record(clock, passengers)
+    else:
+      for _ in range(self.num_simulations):
+        passengers = self.seat_assignment()
+        clock = self.boarding_process(list(passengers)) # boarding_process removes passengers from its list
+        recorder.record(clock, passengers)
+    recorder.close()
+    return recorder
+
   def store_boarding_process(self) -> pd.DataFrame:
     """Runs the boarding simulation and stores data in a DataFrame;
     Returns the DataFrame"""
-    results = []
-    for _ in range(self.num_simulations):
-      passengers = self.seat_assignment()
-      clock = self.boarding_process(passengers)
-      simulation_data = {
-        'Num Rows': self.num_rows,
-        'Num Columns': self.num_cols,
-        'Half Row': self.half_row,
-        'Passenger Speed': self.passenger_speed,
-        'Time Step': self.time_step,
-        'Delay Aisle': self.delay_aisle,
-        'Delay Swap': self.delay_swap,
-        'Boarding Time': clock
-      }
-      
-      results.append(simulation_data)
-    df = pd.DataFrame(results)
-    return df
+    return self.record_boarding_process(BoardingRecorder(self.get_config())).to_dataframe()
 
 if __name__ == "__main__":
     num_simulations = 100
     
     boarding_process = BoardingProcess(num_simulations)
-    boarding_process.run_boarding_process()
-    print(boarding_process.store_boarding_process()[:5])
+    # Simulate once, then use the same boardings for the statistics and the table
+    recorder = boarding_process.record_boarding_process(BoardingRecorder(boarding_process.get_config()))
+    boarding_process.run_boarding_process(recorder.times)
+    print(recorder.to_dataframe()[:5])
     print(f"and {num_simulations - 5} more rows...")
\ No newline at end of file
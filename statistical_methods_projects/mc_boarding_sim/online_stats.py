@@ -0,0 +1,48 @@
+# Importing the necessary libraries
+import math
+from statistics import NormalDist
+
+# Keeps the mean and variance of a stream of values up to date one value at a time (Welford's method),
+# without storing the values and without the rounding errors of summing squares
+class RunningStatistics:
+  def __init__(self):
+    self.count = 0 # Number of values seen
+    self.mean = 0.0
+    self.m2 = 0.0 # Sum of squared differences from the mean
+
+  def add(self, value: float):
+    """Adds one value to the statistics"""
+    self.count += 1
+    delta = value - self.mean
+    self.mean += delta / self.count
+    self.m2 += delta * (value - self.mean)
+
+  def merge(self, other: "RunningStatistics"):
+    """Adds all of the values seen by another RunningStatistics (e.g. from another process)"""
+    count = self.count + other.count
+    if count == 0:
+      return
+    delta = other.mean - self.mean
+    self.m2 += other.m2 + delta ** 2 * self.count * other.count / count
+    self.mean += delta * other.count / count
+    self.count = count
+
+  def variance(self) -> float:
+    """Returns the sample variance (nan for fewer than two values)"""
+    return self.m2 / (self.count - 1) if self.count > 1 else float("nan")
+
+  def standard_error(self) -> float:
+    """Returns the standard error of the mean"""
+    return math.sqrt(self.variance() / self.count) if self.count > 1 else float("inf")
+
+  def half_width(self, confidence: float = 0.95) -> float:
+    """Returns the half-width of the (normal) confidence interval on the mean"""
+    return NormalDist().inv_cdf(0.5 + confidence / 2) * self.standard_error()
+
+  def precision_reached(self, absolute: float = None, relative: float = None, confidence: float = 0.95) -> bool:
+    """Checks if the confidence interval on the mean is within absolute (same units as the values)
+    or within relative times the mean"""
+    half_width = self.half_width(confidence)
+    if absolute is not None and half_width <= absolute:
+      return True
+    return relative is not None and half_width <= relative * abs(self.mean)
@@ -0,0 +1,57 @@
+# Importing the necessary libraries
+import math
+import os
+import random
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+# Runs boardings on a pool of worker processes in a reproducible way
+# Every boarding gets its own random stream, derived from one master seed and the boarding's number,
+# so the results are exactly the same no matter how many workers there are or how the work is split up
+
+def simulation_seed(master_seed: int, index: int) -> int:
+  """Derives the seed of boarding number index from the master seed;
+  Returns an integer seed for random.Random"""
+  state = np.random.SeedSequence(master_seed, spawn_key=(index,)).generate_state(4, dtype=np.uint32)
+  return int.from_bytes(state.tobytes(), "little")
+
+def simulate_boardings(process, master_seed: int, indices: range, keep_passengers: bool = False) -> list:
+  """Simulates the boardings with the given numbers, each with its own random stream;
+  Returns a list of (time taken, passengers) for each boarding (the passengers are None unless keep_passengers)"""
+  results = []
+  for index in indices:
+    rng = random.Random(simulation_seed(master_seed, index))
+    passengers = process.seat_assignment(rng)
+    clock = process.boarding_process(list(passengers)) # boarding_process removes passengers from its list
+    results.append((clock, passengers if keep_passengers else None))
+  return results
+
+def boarding_results(process, master_seed: int, workers: int = None, chunk_size: int = None, keep_passengers: bool = False):
+  """Simulates process.num_simulations boardings with process.boarding_process on a pool of workers;
+  Yields (time taken, passengers) for each boarding as the chunks come back (in the same order for any number of workers)"""
+  workers = workers or os.cpu_count() or 1
+  num_simulations = process.num_simulations
+  # Several chunks per worker, so that workers that finish early can pick up more work
+  chunk_size = chunk_size or max(1, math.ceil(num_simulations / (workers * 8)))
+  chunks = [range(start, min(start + chunk_size, num_simulations)) for start in range(0, num_simulations, chunk_size)]
+
+  if workers == 1:
+    for chunk in chunks:
+      yield from simulate_boardings(process, master_seed, chunk, keep_passengers)
+    return
+
+  with ProcessPoolExecutor(max_workers=workers) as pool:
+    # Only a couple of chunks per worker are in flight at once, so finished chunks don't pile up in memory
+    pending = deque()
+    for chunk in chunks:
+      pending.append(pool.submit(simulate_boardings, process, master_seed, chunk, keep_passengers))
+      if len(pending) >= 2 * workers:
+        yield from pending.popleft().result()
+    while pending:
+      yield from pending.popleft().result()
+
+def parallel_boarding_simulation(process, master_seed: int, workers: int = None, chunk_size: int = None) -> list:
+  """Simulates process.num_simulations boardings with process.boarding_process on a pool of workers;
+  Returns a list of times taken for each simulation (in the same order for any number of workers)"""
+  return [time for time, _ in boarding_results(process, master_seed, workers, chunk_size)]
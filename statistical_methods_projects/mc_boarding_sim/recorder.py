@@ -0,0 +1,134 @@
+# Importing the necessary libraries
+import glob
+import json
+import os
+from array import array
+import numpy as np
+import pandas as pd
+
+# Collects the results of a simulation run in compact columns, in a single pass
+# The settings of the run are stored once instead of in every row, the boarding times go into a typed array,
+# and (optionally) the seat time and swap delay of every passenger are kept as well.
+# With a path, the columns are written to disk every chunk_size boardings (as .npz, or .parquet if pyarrow is installed),
+# so a long run can be looked at while it is still going and doesn't have to fit in memory.
+class BoardingRecorder:
+  def __init__(self, config: dict, path: str = None, passengers: bool = False, chunk_size: int = 10000, file_format: str = "npz"):
+    if file_format not in ("npz", "parquet"):
+      raise ValueError(f"Unknown file format '{file_format}'. Choose from: npz, parquet.")
+    self.config = config # Settings of the run, stored once
+    self.path = path # Directory the chunks are written to (None keeps everything in memory)
+    self.passengers = passengers # Whether to keep the per-passenger columns
+    self.chunk_size = chunk_size # Number of boardings per chunk written to disk
+    self.file_format = file_format
+    self.count = 0 # Number of boardings recorded so far
+    self.chunks = 0 # Number of chunks written so far
+    self.times = array("d") # Boarding times not yet written to disk
+    self.boarding = array("q") # Per-passenger columns not yet written to disk
+    self.seat = array("h")
+    self.seat_time = array("d")
+    self.swap_delay = array("d")
+
+    if path is not None:
+      os.makedirs(path, exist_ok=True)
+      with open(os.path.join(path, "config.json"), "w") as file:
+        json.dump(config, file, indent=2)
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *exc_info):
+    self.close()
+
+  def record(self, boarding_time: float, passengers: list = None):
+    """Adds one boarding (and the passengers of it, if the recorder keeps them)"""
+    self.times.append(boarding_time)
+    if self.passengers and passengers is not None:
+      for passenger in passengers:
+        self.boarding.append(self.count)
+        self.seat.append(passenger.get_seat())
+        self.seat_time.append(passenger.seat_time)
+        self.swap_delay.append(passenger.swap_delay)
+    self.count += 1
+    if self.path is not None and len(self.times) >= self.chunk_size:
+      self.flush()
+
+  def record_times(self, times):
+    """Adds the boarding times of several boardings at once (without passengers)"""
+    for boarding_time in times:
+      self.record(float(boarding_time))
+
+  def flush(self):
+    """Writes the columns collected since the last flush to disk as one chunk"""
+    if self.path is None or not self.times:
+      return
+    name = f"{self.chunks:05d}.{self.file_format}"
+    write_chunk(os.path.join(self.path, "times-" + name), {"Boarding Time": np.frombuffer(self.times)}, self.file_format)
+    if self.passengers:
+      write_chunk(os.path.join(self.path, "passengers-" + name), {
+        "Boarding": np.frombuffer(self.boarding, dtype=np.int64),
+        "Seat": np.frombuffer(self.seat, dtype=np.int16),
+        "Seat Time": np.frombuffer(self.seat_time),
+        "Swap Delay": np.frombuffer(self.swap_delay)
+      }, self.file_format)
+    for column in (self.times, self.boarding, self.seat, self.seat_time, self.swap_delay):
+      del column[:]
+    self.chunks += 1
+
+  def close(self):
+    """Writes whatever has not been written to disk yet"""
+    self.flush()
+
+  def to_dataframe(self) -> pd.DataFrame:
+    """Returns the boarding times together with the settings of the run (one row per boarding)"""
+    if self.path is not None:
+      self.flush()
+      return load_recording(self.path)[0]
+    return boarding_dataframe(self.config, np.frombuffer(self.times))
+
+  def passenger_dataframe(self) -> pd.DataFrame:
+    """Returns the seat time and swap delay of every passenger (one row per passenger)"""
+    if self.path is not None:
+      self.flush()
+      return load_recording(self.path)[1]
+    return pd.DataFrame({
+      "Boarding": np.frombuffer(self.boarding, dtype=np.int64),
+      "Seat": np.frombuffer(self.seat, dtype=np.int16),
+      "Seat Time": np.frombuffer(self.seat_time),
+      "Swap Delay": np.frombuffer(self.swap_delay)
+    })
+
+def write_chunk(path: str, columns: dict, file_format: str):
+  """Writes one chunk of columns to path (through a temporary file, so a reader never sees half a chunk)"""
+  temporary = path + ".tmp"
+  if file_format == "parquet":
+    pd.DataFrame(columns).to_parquet(temporary, index=False) # Needs pyarrow
+  else:
+    with open(temporary, "wb") as file:
+      np.savez(file, **columns)
+  os.replace(temporary, path)
+
+def read_chunks(path: str, prefix: str) -> pd.DataFrame:
+  """Reads all of the chunks written so far whose names start with prefix"""
+  frames = []
+  for chunk in sorted(glob.glob(os.path.join(path, prefix + "-*.npz")) + glob.glob(os.path.join(path, prefix + "-*.parquet"))):
+    if chunk.endswith(".parquet"):
+      frames.append(pd.read_parquet(chunk))
+    else:
+      with np.load(chunk) as data:
+        frames.append(pd.DataFrame({column: data[column] for column in data.files}))
+  return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+def boarding_dataframe(config: dict, times: np.ndarray) -> pd.DataFrame:
+  """Returns the boarding times with the settings of the run repeated in every row (like store_boarding_process)"""
+  df = pd.DataFrame({**config, "Boarding Time": times})
+  df.attrs["config"] = config
+  return df
+
+def load_recording(path: str) -> tuple:
+  """Loads a recording written by BoardingRecorder (it may still be in progress);
+  Returns the boarding DataFrame, the passenger DataFrame (empty if not recorded) and the settings of the run"""
+  with open(os.path.join(path, "config.json")) as file:
+    config = json.load(file)
+  times = read_chunks(path, "times")
+  times = times["Boarding Time"].to_numpy() if len(times) else np.zeros(0)
+  return boarding_dataframe(config, times), read_chunks(path, "passengers"), config
@@ -0,0 +1,53 @@
+# Importing the necessary libraries
+import random
+
+# Boarding orders: each one takes every seat of the plane (seat = 10*row + column) and a random generator,
+# and returns the seats in the order the passengers stand in the queue (front of the queue first)
+# The process is passed in for the size of the plane
+
+def aisle_distance(seat: int, num_cols: int) -> int:
+  """Returns how many seats lie between a seat and the aisle (0 for aisle seats)"""
+  column = seat % 10
+  aisle = num_cols // 2 # The aisle is between column aisle and column aisle + 1
+  return aisle - column if column <= aisle else column - aisle - 1
+
+def random_order(seats: list, rng: random.Random, process) -> list:
+  """Everyone boards in a random order (the original seat_assignment)"""
+  rng.shuffle(seats)
+  return seats[::-1]
+
+def back_to_front(seats: list, rng: random.Random, process) -> list:
+  """One row at a time, starting at the back (in a random order within each row)"""
+  rng.shuffle(seats)
+  return sorted(seats, key=lambda seat: -(seat // 10))
+
+def block(seats: list, rng: random.Random, process, num_blocks: int = 4) -> list:
+  """The rows are split into num_blocks blocks that board from the back (in a random order within each block)"""
+  rng.shuffle(seats)
+  rows_per_block = -(-process.num_rows // num_blocks)
+  return sorted(seats, key=lambda seat: -((seat // 10 - 1) // rows_per_block))
+
+def window_middle_aisle(seats: list, rng: random.Random, process) -> list:
+  """Window seats first, then middle seats, then aisle seats (in a random order within each group)"""
+  rng.shuffle(seats)
+  return sorted(seats, key=lambda seat: -aisle_distance(seat, process.num_cols))
+
+def steffen(seats: list, rng: random.Random, process) -> list:
+  """Steffen's method: window seats first, starting at the back and skipping every other row,
+  one side of the plane and then the other, then the rows in between; then the same for the middle and aisle seats"""
+  aisle = process.num_cols // 2
+  return sorted(seats, key=lambda seat: (
+    -aisle_distance(seat, process.num_cols), # Window seats first
+    (process.num_rows - seat // 10) % 2, # Every other row, starting with the last one
+    seat % 10 > aisle, # One side, then the other
+    -(seat // 10) # Back to front
+  ))
+
+# Boarding orders that can be picked by name
+STRATEGIES = {
+  "random": random_order,
+  "back-to-front": back_to_front,
+  "block": block,
+  "window-middle-aisle": window_middle_aisle,
+  "steffen": steffen
+}
@@ -0,0 +1,165 @@
+# Importing the necessary libraries
+import argparse
+import hashlib
+import itertools
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import pandas as pd
+from main import BoardingProcess
+from event_driven import EventDrivenBoardingProcess
+from cabin import CabinBoardingProcess
+from online_stats import RunningStatistics
+
+# Settings of BoardingProcess that can be swept over, and their column names in the table
+PARAMETERS = {
+  "passenger_speed": "Passenger Speed",
+  "delay_aisle": "Delay Aisle",
+  "delay_swap": "Delay Swap",
+  "num_rows": "Num Rows",
+  "num_cols": "Num Columns",
+  "half_row": "Half Row"
+}
+
+# Simulations that can run the points of a sweep
+ENGINES = {
+  "objects": BoardingProcess,
+  "event": EventDrivenBoardingProcess,
+  "cabin": CabinBoardingProcess
+}
+
+def grid(**values) -> list:
+  """Builds every combination of the given values, e.g. grid(delay_aisle=[15, 25], num_rows=[20, 28]);
+  Returns a list of configurations (dicts)"""
+  names = list(values)
+  return [dict(zip(names, combination)) for combination in itertools.product(*(values[name] for name in names))]
+
+def point_key(config: dict, num_simulations: int, seed: int, engine: str) -> str:
+  """Returns the name of the cache file of one point (a hash of everything that changes its result)"""
+  text = json.dumps({"config": config, "num_simulations": num_simulations, "seed": seed, "engine": engine}, sort_keys=True)
+  return hashlib.sha256(text.encode()).hexdigest()[:20]
+
+def make_process(config: dict, num_simulations: int, seed: int, engine: str) -> BoardingProcess:
+  """Creates the simulation of one point with the settings in config;
+  Raises a ValueError for settings the engines can't simulate"""
+  if engine not in ENGINES:
+    raise ValueError(f"Unknown engine '{engine}'. Choose from: {', '.join(ENGINES)}.")
+  process = ENGINES[engine](num_simulations, master_seed=seed)
+  for name, value in config.items():
+    if name not in PARAMETERS:
+      raise ValueError(f"Unknown parameter '{name}'. Choose from: {', '.join(PARAMETERS)}.")
+    setattr(process, name, value)
+  if process.num_cols > 9:
+    raise ValueError("Seat numbers are 10*row + column, so there can be at most 9 columns.")
+  if process.passenger_speed <= 0 or process.delay_aisle < 0 or process.delay_swap < 0:
+    raise ValueError("passenger_speed has to be positive, and delay_aisle and delay_swap can't be negative.")
+
+  # The time-stepped engines only sit a passenger down when their position is exactly their row, so every
+  # step has to land on the seats and queue places, with no rounding (a fraction of a power of two metres)
+  step = process.passenger_speed * process.time_step
+  distances = (process.delta_seats, process.delta_passengers, process.gate)
+  if not (step * 2**20).is_integer() or not all((distance / step).is_integer() for distance in distances):
+    raise ValueError(f"passenger_speed * time_step = {step} m per step doesn't land exactly on the seats "
+                     f"({process.delta_seats} m apart) and the queue ({process.delta_passengers} m apart), "
+                     f"so the passengers would never reach their row (e.g. passenger_speed = 0.5, 1 or 2 works).")
+  return process
+
+def run_point(config: dict, num_simulations: int, seed: int, engine: str) -> dict:
+  """Simulates num_simulations boardings with the settings in config (the same random queues for every point);
+  Returns the summary of the boarding times"""
+  process = make_process(config, num_simulations, seed, engine)
+
+  start = time.perf_counter()
+  stats = RunningStatistics()
+  for clock in process.boarding_simulation():
+    stats.add(clock)
+  return {
+    "config": config,
+    "num_simulations": num_simulations,
+    "seed": seed,
+    "engine": engine,
+    "mean": stats.mean,
+    "std": math.sqrt(stats.variance()) if stats.count > 1 else 0.0,
+    "half_width": stats.half_width() if stats.count > 1 else float("inf"),
+    "seconds": time.perf_counter() - start
+  }
+
+def load_point(path: str) -> dict:
+  """Returns a cached point, or None if it hasn't been computed yet"""
+  try:
+    with open(path) as file:
+      return json.load(file)
+  except (FileNotFoundError, json.JSONDecodeError):
+    return None
+
+def save_point(path: str, result: dict):
+  """Saves a finished point (through a temporary file, so an interrupted sweep never leaves half a file)"""
+  with open(path + ".tmp", "w") as file:
+    json.dump(result, file, indent=2)
+  os.replace(path + ".tmp", path)
+
+def run_sweep(configs: list, num_simulations: int = 100, seed: int = 5, engine: str = "event",
+              cache_dir: str = "sweep_cache", workers: int = None, progress: bool = False) -> pd.DataFrame:
+  """Runs every configuration on a pool of workers, skipping the points already in cache_dir;
+  Returns one table with a row per configuration (in the order given)"""
+  os.makedirs(cache_dir, exist_ok=True)
+  paths = [os.path.join(cache_dir, point_key(config, num_simulations, seed, engine) + ".json") for config in configs]
+  results = [load_point(path) for path in paths]
+  missing = [index for index, result in enumerate(results) if result is None]
+  for index in missing:
+    make_process(configs[index], num_simulations, seed, engine) # Bad settings stop the sweep before the pool starts
+  if progress:
+    print(f"{len(configs) - len(missing)} of {len(configs)} points are cached, computing {len(missing)}.")
+
+  if missing:
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+      futures = {pool.submit(run_point, configs[index], num_simulations, seed, engine): index for index in missing}
+      for done, future in enumerate(as_completed(futures), 1):
+        index = futures[future]
+        results[index] = future.result()
+        save_point(paths[index], results[index]) # Saved right away, so an interrupted sweep keeps its finished points
+        if progress:
+          print(f"[{done}/{len(missing)}] {configs[index]}: {results[index]['mean']:.1f} s")
+
+  rows = []
+  for result in results:
+    row = {PARAMETERS[name]: value for name, value in result["config"].items()}
+    row.update({
+      "Num Simulations": result["num_simulations"],
+      "Mean Boarding Time": result["mean"],
+      "Std Boarding Time": result["std"],
+      "CI Half Width": result["half_width"],
+      "Seconds": result["seconds"]
+    })
+    rows.append(row)
+  return pd.DataFrame(rows)
+
+def main(argv=None) -> None:
+  """Runs a sweep over a grid of settings from the command line"""
+  defaults = BoardingProcess(0)
+  parser = argparse.ArgumentParser(description="Run the boarding simulation over a grid of settings.")
+  for name in PARAMETERS:
+    if name == "half_row":
+      kind = lambda text: text.lower() in ("1", "true", "yes")
+    else:
+      kind = int if name in ("num_rows", "num_cols") else float
+    parser.add_argument("--" + name.replace("_", "-"), type=kind, nargs="+", default=[getattr(defaults, name)],
+                        help=f"values of {name} (default: {getattr(defaults, name)})")
+  parser.add_argument("--simulations", type=int, default=100, help="number of boardings per point")
+  parser.add_argument("--seed", type=int, default=5, help="master seed (the same for every point)")
+  parser.add_argument("--engine", choices=list(ENGINES), default="event", help="simulation used for every point")
+  parser.add_argument("--workers", type=int, help="number of worker processes (default: number of cores)")
+  parser.add_argument("--cache", default="sweep_cache", help="directory for the finished points")
+  parser.add_argument("--output", help="file to save the table to (CSV)")
+  args = parser.parse_args(argv)
+
+  configs = grid(**{name: getattr(args, name) for name in PARAMETERS})
+  table = run_sweep(configs, args.simulations, args.seed, args.engine, args.cache, args.workers, progress=True)
+  print(table.to_string(index=False))
+  if args.output:
+    table.to_csv(args.output, index=False)
+
+if __name__ == "__main__":
+  main()
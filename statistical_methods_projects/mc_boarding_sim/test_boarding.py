@@ -0,0 +1,64 @@
+import random
+import unittest
+import numpy as np
+from main import BoardingProcess
+from event_driven import EventDrivenBoardingProcess
+from online_stats import RunningStatistics
+from sweep import make_process
+from tournament import is_worse, num_rounds
+from vectorized import VectorizedBoardingProcess
+
+# Checks that the faster engines give the same boarding times as BoardingProcess.boarding_process
+class TestEngines(unittest.TestCase):
+
+  def boarding_times(self, process, num_boardings=5, **settings):
+    """Returns the boarding times of the first num_boardings seeded queues with the given settings"""
+    for name, value in settings.items():
+      setattr(process, name, value)
+    return [process.boarding_process(process.seat_assignment(random.Random(seed))) for seed in range(num_boardings)]
+
+  def test_event_driven(self):
+    """This function tests that the event-driven engine matches boarding_process, also for delays that aren't
+    a multiple of time_step (they are rounded up to the next time step)."""
+    for delays in [dict(delay_aisle=25, delay_swap=11, delay_double=22),
+                   dict(delay_aisle=7.3, delay_swap=11, delay_double=22),
+                   dict(delay_aisle=25.1, delay_swap=4.6, delay_double=9.1),
+                   dict(delay_aisle=0, delay_swap=0, delay_double=0)]:
+      with self.subTest(**delays):
+        expected = self.boarding_times(BoardingProcess(1), **delays)
+        self.assertEqual(self.boarding_times(EventDrivenBoardingProcess(1), **delays), expected)
+
+  def test_vectorized(self):
+    """This function tests that a batch of the vectorized engine matches boarding_process queue by queue."""
+    process = BoardingProcess(1)
+    queues = [process.seat_assignment(random.Random(seed)) for seed in range(20)]
+    seats = np.array([[passenger.get_seat() for passenger in queue] for queue in queues])
+    positions = np.array([[passenger.get_position() for passenger in queue] for queue in queues])
+    expected = [process.boarding_process(queue) for queue in queues]
+    self.assertEqual(VectorizedBoardingProcess(20).boarding_process(seats, positions).tolist(), expected)
+
+  def test_sweep_settings(self):
+    """This function tests that sweeps reject a passenger_speed whose steps don't land on the seats
+    (the time-stepped engines would never finish)."""
+    for speed in [0.5, 1, 2]:
+      make_process({"passenger_speed": speed}, 1, 5, "objects")
+    for config in [{"passenger_speed": 0.8}, {"passenger_speed": 0.75}, {"passenger_speed": 0},
+                   {"delay_aisle": -1}, {"delay_speed": 1}]:
+      with self.subTest(**config), self.assertRaises(ValueError):
+        make_process(config, 1, 5, "objects")
+
+  def test_tournament_test(self):
+    """This function tests the tournament's comparison when both orders always take the same time,
+    and the number of rounds the confidence is split over."""
+    fast, slow, same = RunningStatistics(), RunningStatistics(), RunningStatistics()
+    for _ in range(10):
+      fast.add(551.25)
+      slow.add(600)
+      same.add(551.25)
+    self.assertTrue(is_worse(slow, fast, 3))
+    self.assertFalse(is_worse(same, fast, 3))
+    self.assertEqual(num_rounds(10, 10, 1000), 100)
+    self.assertEqual(num_rounds(10, 7, 30), 4)
+
+if __name__ == "__main__":
+  unittest.main()
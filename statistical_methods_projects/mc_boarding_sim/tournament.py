@@ -0,0 +1,105 @@
+# Importing the necessary libraries
+import argparse
+import math
+import random
+from statistics import NormalDist
+import pandas as pd
+from event_driven import EventDrivenBoardingProcess
+from online_stats import RunningStatistics
+from parallel import simulation_seed
+from strategies import STRATEGIES
+
+# Races boarding orders against each other: every order still in the race gets a few more boardings per round,
+# and an order is dropped as soon as its mean boarding time is significantly worse than the current leader's,
+# so the boardings are spent on the orders that are still hard to tell apart
+
+def simulate(process, stats: RunningStatistics, num_boardings: int, master_seed: int):
+  """Simulates num_boardings more boardings with process and adds them to stats
+  (boarding number k of every order uses the same random stream)"""
+  for _ in range(num_boardings):
+    rng = random.Random(simulation_seed(master_seed, stats.count))
+    stats.add(process.boarding_process(process.seat_assignment(rng)))
+
+def is_worse(stats: RunningStatistics, leader: RunningStatistics, z: float) -> bool:
+  """Checks if the mean of stats is larger than the leader's by more than z standard errors of the difference"""
+  difference = stats.mean - leader.mean
+  spread = math.sqrt(stats.variance() / stats.count + leader.variance() / leader.count)
+  if spread == 0:
+    return difference > 0 # Both orders always take the same time (e.g. Steffen's method), so the means are exact
+  return difference > z * spread
+
+def num_rounds(initial: int, batch: int, max_boardings: int) -> int:
+  """Returns the largest number of rounds a tournament can take (the first round, then batch more boardings per round)"""
+  return 1 + max(0, math.ceil((max_boardings - initial) / batch))
+
+def run_tournament(strategies: dict = STRATEGIES, initial: int = 10, batch: int = 10, max_boardings: int = 1000,
+                   confidence: float = 0.95, master_seed: int = 5, engine=EventDrivenBoardingProcess,
+                   progress: bool = False) -> pd.DataFrame:
+  """Races the boarding orders in strategies (name -> order function, see strategies.py) until one is left
+  or the ones left have had max_boardings boardings each; Returns a table with one row per order, best first"""
+  if initial < 2:
+    raise ValueError("Every order needs at least two boardings to start with.")
+  if batch < 1:
+    raise ValueError("Every round needs at least one more boarding per order.")
+  # One-sided test against the leader, with the confidence split over all of the comparisons in all of the rounds
+  # (every round looks at the data again, so the chance of wrongly dropping the best order adds up over the rounds)
+  comparisons = max(1, len(strategies) - 1) * num_rounds(initial, batch, max_boardings)
+  z = NormalDist().inv_cdf(1 - (1 - confidence) / comparisons)
+  processes, stats, dropped = {}, {}, {}
+  for name, order in strategies.items():
+    processes[name] = engine(0)
+    processes[name].boarding_order = order
+    stats[name] = RunningStatistics()
+  alive = list(strategies)
+  total = 0 # Boardings simulated so far by all of the orders together
+
+  while len(alive) > 1:
+    for name in alive:
+      num_boardings = min(initial if stats[name].count == 0 else batch, max_boardings - stats[name].count)
+      simulate(processes[name], stats[name], num_boardings, master_seed)
+      total += num_boardings
+    leader = min(alive, key=lambda name: stats[name].mean)
+    for name in alive:
+      if name != leader and is_worse(stats[name], stats[leader], z):
+        dropped[name] = total
+        if progress:
+          print(f"Dropped {name} after {stats[name].count} boardings ({stats[name].mean:.1f} s against {stats[leader].mean:.1f} s for {leader}).")
+    alive = [name for name in alive if name not in dropped]
+    if all(stats[name].count >= max_boardings for name in alive):
+      break
+
+  rows = []
+  for name in sorted(strategies, key=lambda name: (name in dropped, stats[name].mean)):
+    if name in dropped:
+      result = f"dropped at {dropped[name]} boardings in total"
+    else:
+      result = "best" if len(alive) == 1 else "not separated"
+    rows.append({
+      "Strategy": name,
+      "Boardings": stats[name].count,
+      "Mean Boarding Time": stats[name].mean,
+      "CI Half Width": stats[name].half_width(confidence),
+      "Result": result
+    })
+  return pd.DataFrame(rows)
+
+def main(argv=None) -> None:
+  """Runs a tournament between boarding orders from the command line"""
+  parser = argparse.ArgumentParser(description="Find the fastest boarding order by racing them against each other.")
+  parser.add_argument("--strategies", nargs="+", choices=list(STRATEGIES), default=list(STRATEGIES), help="orders to race")
+  parser.add_argument("--initial", type=int, default=10, help="boardings per order in the first round")
+  parser.add_argument("--batch", type=int, default=10, help="boardings per order in each later round")
+  parser.add_argument("--max-boardings", type=int, default=1000, help="most boardings for any one order")
+  parser.add_argument("--confidence", type=float, default=0.95, help="confidence needed to drop an order")
+  parser.add_argument("--seed", type=int, default=5, help="master seed")
+  args = parser.parse_args(argv)
+
+  table = run_tournament({name: STRATEGIES[name] for name in args.strategies}, args.initial, args.batch,
+                         args.max_boardings, args.confidence, args.seed, progress=True)
+  print(table.to_string(index=False))
+  used = int(table["Boardings"].sum())
+  print(f"The race used {used} boardings, {used / (len(table) * args.max_boardings):.1%} of the {len(table) * args.max_boardings} "
+        f"a fixed comparison with {args.max_boardings} boardings per order would take.")
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,159 @@
+# Importing the necessary libraries
+import numpy as np
+from main import BoardingProcess
+from online_stats import RunningStatistics
+
+# Runs many independent boardings side by side as NumPy arrays
+# Follows exactly the same rules as BoardingProcess.boarding_process, one time step at a time,
+# but every passenger of every boarding in the batch is updated together in each step
+class VectorizedBoardingProcess(BoardingProcess):
+  def __init__(self, num_simulations: int, seed: int = 5, batch_size: int = 1000):
+    super().__init__(num_simulations)
+    self.seed = seed # Seed for the NumPy random generator
+    self.batch_size = batch_size # Number of boardings advanced together
+
+  def seat_queues(self, rng: np.random.Generator, num_boardings: int) -> tuple:
+    """Assigns seats to passengers in a random order for num_boardings boardings at once;
+    Returns the seat numbers and starting positions of the passengers, one row per boarding"""
+    # Same seat numbering and queue spacing as seat_assignment (seat = 10*row + column)
+    seats = np.array([(i + 1) * 10 + j + 1 for i in range(self.num_rows) for j in range(self.num_cols)])
+    queues = rng.permuted(np.tile(seats, (num_boardings, 1)), axis=1)
+    positions = np.broadcast_to(self.gate - np.arange(seats.size) * self.delta_passengers, queues.shape)
+
+    # The half row leaves a gap in the queue, just like in seat_assignment
+    if self.half_row:
+      keep = (queues < 14) | (queues > 16)
+      num_passengers = int(keep[0].sum())
+      return queues[keep].reshape(num_boardings, num_passengers), positions[keep].reshape(num_boardings, num_passengers)
+    return queues, positions.copy()
+
+  def boarding_process(self, seats: np.ndarray, positions: np.ndarray) -> np.ndarray:
+    """Simulates a batch of boardings (one row of seats/positions per boarding);
+    Returns the total time taken for each boarding"""
+    # Arrays are stored passenger-major (one row per place in the queue, one column per boarding),
+    # so that looking along the queue is an operation over whole rows
+    num_boardings, num_passengers = seats.shape
+    rows = np.ascontiguousarray(seats.T // 10)
+    columns = np.ascontiguousarray(seats.T % 10)
+    step = self.passenger_speed * self.time_step
+    far = 1e9 # Stands in for "no passenger ahead"
+    targets = (rows - 1) * self.delta_seats
+    position = positions.T.astype(float)
+    timer = np.zeros(rows.shape)
+    active = np.ones(rows.shape, dtype=bool) # Still in the aisle/queue
+    seated = np.zeros((num_boardings, self.num_rows + 1, self.num_cols + 2), dtype=bool)
+    boarding = np.arange(num_boardings) # Which boarding each column of the arrays belongs to
+    chain_index = 2 * np.arange(num_passengers, dtype=np.int32)[:, None] + 1
+    times = np.zeros(num_boardings)
+    clock = 0
+
+    while boarding.size:
+      clock += self.time_step
+      width = boarding.size
+
+      # If passenger is busy, reduce timer
+      timer -= (timer > 0) * self.time_step
+      ready = active & (timer <= 0)
+
+      # If passenger is at correct row, sit down
+      sit = ready & (position == targets)
+      p, b = np.divmod(np.flatnonzero(sit), width)
+      seated[b, rows[p, b], columns[p, b]] = True
+      active ^= sit
+      walking = ready ^ sit
+
+      # Position of the passenger ahead (the nearest one still in the aisle)
+      ahead = np.empty_like(position)
+      ahead[0] = far
+      np.minimum.accumulate((position + ~active * far)[:-1], axis=0, out=ahead[1:])
+      gap = ahead - position
+
+      # A passenger moves if the one ahead is far enough away after its own move in this step:
+      # can_move = far enough even if the passenger ahead stands still,
+      # cannot_move = not far enough even if the passenger ahead moves (or not walking at all).
+      # Passengers in between move only if the passenger ahead does, so each passenger follows
+      # the nearest can/cannot decision ahead of it (seated passengers are skipped over).
+      can_move = walking & (gap - step >= self.delta_passengers)
+      cannot_move = active & ~(walking & (gap >= self.delta_passengers))
+      decision = np.maximum.accumulate((can_move | cannot_move) * (chain_index + can_move) - 1, axis=0)
+      moves = walking & (decision & 1).astype(bool)
+      position += moves * step
+
+      # Correct row found, checking if swap is needed
+      arrived = moves & (position == targets)
+      p, b = np.divmod(np.flatnonzero(arrived), width)
+      if p.size:
+        timer[p, b] += self.delay_aisle + self.swap_delays(columns[p, b], seated[b, rows[p, b]])
+
+      # Boardings where everyone has sat down are finished, and are dropped from the arrays
+      finished = ~active.any(axis=0)
+      if finished.any():
+        times[boarding[finished]] = clock
+        keep = ~finished
+        rows, columns, targets, position, timer, active = (
+          array[:, keep] for array in (rows, columns, targets, position, timer, active))
+        seated = seated[keep]
+        boarding = boarding[keep]
+
+      # Places at the front of the queue that have sat down in every boarding left are dropped as well,
+      # so each step only works on the part of the queue that is still in the aisle somewhere
+      front = int(active.any(axis=1).argmax())
+      if front:
+        rows, columns, targets, position, timer, active, chain_index = (
+          array[front:] for array in (rows, columns, targets, position, timer, active, chain_index))
+    return times
+
+  def boarding_batches(self):
+    """Simulates the boarding process for a number of times specified by num_simulations,
+    batch_size boardings at a time; Yields an array of times taken for each batch"""
+    rng = np.random.default_rng(self.seed)
+    for start in range(0, self.num_simulations, self.batch_size):
+      seats, positions = self.seat_queues(rng, min(self.batch_size, self.num_simulations - start))
+      yield self.boarding_process(seats, positions)
+
+  def boarding_simulation(self) -> np.ndarray:
+    """Simulates the boarding process for a number of times specified by num_simulations;
+    Returns an array of times taken for each simulation"""
+    return np.concatenate(list(self.boarding_batches()))
+
+  def sequential_boarding_simulation(self, absolute: float = None, relative: float = None, confidence: float = 0.95,
+                                     min_simulations: int = 30, max_simulations: int = 1000000) -> RunningStatistics:
+    """Same as BoardingProcess.sequential_boarding_simulation, but batch_size boardings are simulated at a time
+    (the rest of the last batch is not counted once the precision is reached); Returns the running statistics"""
+    if absolute is None and relative is None:
+      raise ValueError("Give an absolute or a relative precision.")
+    rng = np.random.default_rng(self.seed)
+    stats = RunningStatistics()
+    while stats.count < max_simulations:
+      seats, positions = self.seat_queues(rng, min(self.batch_size, max_simulations - stats.count))
+      for time in self.boarding_process(seats, positions):
+        stats.add(time)
+        if stats.count >= min_simulations and stats.precision_reached(absolute, relative, confidence):
+          return stats
+    return stats
+
+  def record_boarding_process(self, recorder):
+    """Runs the simulation once, streaming the boarding times into the recorder one batch at a time
+    (there are no passenger objects here, so only the boarding times are recorded); Returns the recorder"""
+    for times in self.boarding_batches():
+      recorder.record_times(times)
+    recorder.close()
+    return recorder
+
+  def swap_delays(self, columns: np.ndarray, row_seated: np.ndarray) -> np.ndarray:
+    """Vectorized version of is_swap_needed for the passengers that just reached their row;
+    row_seated holds which seats of each passenger's row are already taken"""
+    offset = np.zeros(columns.shape)
+    for column in range(1, self.num_cols + 1):
+      blockers = list(self.get_blockers(column))
+      if blockers:
+        here = columns == column
+        num_swaps = row_seated[here][:, blockers].sum(axis=1)
+        offset[here] = [self.swap_offset(n) for n in num_swaps]
+    return offset
+
+if __name__ == "__main__":
+    num_simulations = 10000
+
+    boarding_process = VectorizedBoardingProcess(num_simulations)
+    boarding_process.run_boarding_process()
@@ -1,113 +1,175 @@
 # Importing necessary libraries
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy.stats import chi2, poisson
+import argparse
+import json
+import os
 from pathlib import Path
 
-# Load the path of text files
-real_mass_path = Path(__file__).with_name('real_mass.txt')
-mc1_mass_path = Path(__file__).with_name('MC1_mass.txt')
-mc2_mass_path = Path(__file__).with_name('MC2_mass.txt')
-
-# Load the information from the files
-real_mass = np.loadtxt(real_mass_path)
-mc1_mass = np.loadtxt(mc1_mass_path)
-mc2_mass = np.loadtxt(mc2_mass_path)
-
-# Calculate chi-square values for MC1 and MC2
-# Chi-square is a statistical test that tells how observations are distributed across different outcomes
-chi2_1 = np.sum((real_mass[:, 2] - mc1_mass[:, 2]) ** 2 / mc1_mass[:, 2]) # For background 1
-chi2_2 = np.sum((real_mass[:, 2] - mc2_mass[:, 2]) ** 2 / mc2_mass[:, 2]) # For background 2
-print(f"\nThe chi^2 values for MC1 and MC2 are {chi2_1:.2f} and {chi2_2:.2f}, respectively.")
-
-# Calculate P-values using chi-square cumulative distribution
-# P-value is the probability that, if the null hypothesis were true, we would observe a more extreme test statistic
-dof = len(real_mass[:, 2]) # Degrees of freedom
-P_1 = 1 - chi2.cdf(chi2_1, dof) # P-value for background 1
-P_2 = 1 - chi2.cdf(chi2_2, dof) # P-value for background 2
-print(f"\nThe P-values for backgrounds 1 and 2 are P1 = {P_1:.0f} and P2 = {P_2:.3f}.")
-
-# **Perform pseudoexperiments by generating simulated data based on the Poisson distribution 
-# with means given by the simulated mass data for backgrounds 1 and 2**
-
-edges = np.append(real_mass[:, 0], np.max(real_mass[:, 1])) # Defines edges of histogram bins
-k = 10000 # Number of data samples
-
-pseudo_1 = np.zeros((len(mc1_mass[:, 2]), k)) 
-pseudo_2 = np.zeros((len(mc2_mass[:, 2]), k))
-
-for i in range(len(mc1_mass[:, 2])):
-    pseudo_1[i, :] = poisson.rvs(mc1_mass[i, 2], size=k) # For background 1
-
-for i in range(len(mc2_mass[:, 2])):
-    pseudo_2[i, :] = poisson.rvs(mc2_mass[i, 2], size=k) # For background 2
-
-# Chi-square values are calculated for the pseudoexperiments
-chi2_1_pseudo = np.zeros(k)
-chi2_2_pseudo = np.zeros(k)
-
-for i in range(k):
-    chi2_1_pseudo[i] = np.sum((pseudo_1[:, i] - mc1_mass[:, 2]) ** 2 / mc1_mass[:, 2]) # For background 1
-    chi2_2_pseudo[i] = np.sum((pseudo_2[:, i] - mc2_mass[:, 2]) ** 2 / mc2_mass[:, 2]) # For background 2
-    
-# Calculate P-values using pseudoexperiments
-P_1_pseudo = np.sum(chi2_1_pseudo > chi2_1) / k
-P_2_pseudo = np.sum(chi2_2_pseudo > chi2_2) / k
-
-print(f"\nThe P-values for pseudoexperiments with backgrounds 1 and 2 are P1 = {P_1_pseudo:.3f} and P2 = {P_2_pseudo:.3f}.")
-
-# Plotting the chi-square distributions with histograms
-chi2_values = np.arange(0, 101, 1) # x-axis values 1-100
-chi2_hist_p1, _ = np.histogram(chi2_1_pseudo, bins=chi2_values, density=True) # y-axis values
-chi2_hist_p2, _ = np.histogram(chi2_2_pseudo, bins=chi2_values, density=True) # y-axis values
-
-# Plotting the first figure against backgrounds 1 and 2
-plt.plot(chi2_values, chi2.pdf(chi2_values, dof), 'g', label='Theoretical')
-plt.plot(chi2_values[:100], chi2_hist_p1, 'r', label='Pseudo - Bkg 1')
-plt.plot(chi2_values[:100], chi2_hist_p2, 'b', label='Pseudo - Bkg 2')
-plt.legend()
-plt.xlabel('$\chi^{2}$ values')
-plt.ylabel('Probability')
-plt.title('Real data vs. Backgrounds 1 & 2')
-plt.show()
-
-# Find optimal value of parameter 'a' 
-best_a = 0 # Should best combine the backgrounds 1 and 2 to model the real data
-chi2_min = np.inf # Minimum chi-square value obtained during the search for best_a
-
-for a in np.arange(0, 1.0001, 0.0001):
-    combo = a * mc1_mass + (1 - a) * mc2_mass
-    chi2_combo = np.sum((real_mass[:, 2] - combo[:, 2]) ** 2 / combo[:, 2])
-    if chi2_combo < chi2_min:
-        chi2_min = chi2_combo
-        best_a = a # Found best 'a'
-
-best_combo = best_a * mc1_mass + (1 - best_a) * mc2_mass # Combination of backgrounds 1 and 2 that best models the real data based on 'a'
-P_theor = 1 - chi2.cdf(chi2_min, dof) # Theoretical p-value calculated using the minchi2 value
-
-# Doing the same thing but for pseudoexperimental data
-pseudo_combo = np.zeros((len(mc1_mass[:, 2]), k))
-for i in range(len(mc1_mass[:, 2])):
-    pseudo_combo[i, :] = poisson.rvs(best_combo[i, 2], size=k)
-
-chi2_combo = np.zeros(k)
-for i in range(k):
-    chi2_combo[i] = np.sum((pseudo_combo[:, i] - best_combo[:, 2]) ** 2 / best_combo[:, 2])
-
-P_combo = np.sum(chi2_combo > chi2_min) / k
-
-print(f"\nCombining backgrounds 1 and 2 to best model the real data:")
-print(f"Value of 'a' that best combines the backgrounds: a = {best_a:.3f}")
-print(f"Minimum chi-square value obtained while finding 'a': {chi2_min:.2f}")
-print(f"P-value based on the chi-square value: P = {P_theor:.3f}")
-print(f"P-value for pseudoexperiments: P = {P_combo:.3f}\n")
-
-
-# Plotting the second figure with the combined background
-plt.plot(best_combo[:, 0], best_combo[:, 2], '-b', label='Combination of bkg')
-plt.plot(real_mass[:, 0], real_mass[:, 2], '-g', label='Data')
-plt.legend()
-plt.xlabel('Mass')
-plt.ylabel('Probability')
-plt.title('Real data vs. Optimal/Combined background')
-plt.show()
+def load_data(directory=Path(__file__).parent):
+    """Loads the real data and the two simulated backgrounds (columns: lower bin edge, upper bin edge, counts)"""
+    # Load the path of text files
+    real_mass_path = Path(directory) / 'real_mass.txt'
+    mc1_mass_path = Path(directory) / 'MC1_mass.txt'
+    mc2_mass_path = Path(directory) / 'MC2_mass.txt'
+
+    # Load the information from the files
+    return np.loadtxt(real_mass_path), np.loadtxt(mc1_mass_path), np.loadtxt(mc2_mass_path)
+
+def chi_square(observed, expected):
+    """Chi-square is a statistical test that tells how observations are distributed across different outcomes
+    (observed can have one column per pseudoexperiment)"""
+    if np.ndim(observed) == 2:
+        expected = expected[:, None]
+    return np.sum((observed - expected) ** 2 / expected, axis=0)
+
+def pseudo_experiments(expected, k):
+    """Generates k sets of simulated data based on the Poisson distribution with means given by expected
+    (one column per pseudoexperiment)"""
+    from scipy.stats import poisson
+
+    pseudo = np.zeros((len(expected), k))
+    for i in range(len(expected)):
+        pseudo[i, :] = poisson.rvs(expected[i], size=k)
+    return pseudo
+
+def best_combination(real_mass, mc1_mass, mc2_mass):
+    """Finds the value of 'a' for which a * background 1 + (1 - a) * background 2 best models the real data;
+    Returns a and the minimum chi-square value obtained during the search"""
+    a_values = np.arange(0, 1.0001, 0.0001)
+    combos = a_values[:, None] * mc1_mass[:, 2] + (1 - a_values[:, None]) * mc2_mass[:, 2]
+    chi2_combos = np.sum((real_mass[:, 2] - combos) ** 2 / combos, axis=1)
+    best = np.argmin(chi2_combos) # The first one with the smallest chi-square value
+    return a_values[best], chi2_combos[best]
+
+def analyze(real_mass, mc1_mass, mc2_mass, k=10000, seed=None):
+    """Runs all three tests (seed is for np.random, None for different pseudoexperiments every time);
+    Returns the numeric results and the arrays needed for the figures"""
+    from scipy.stats import chi2
+
+    if seed is not None:
+        np.random.seed(seed)
+
+    # Calculate chi-square values for MC1 and MC2
+    chi2_1 = chi_square(real_mass[:, 2], mc1_mass[:, 2]) # For background 1
+    chi2_2 = chi_square(real_mass[:, 2], mc2_mass[:, 2]) # For background 2
+
+    # Calculate P-values using chi-square cumulative distribution
+    # P-value is the probability that, if the null hypothesis were true, we would observe a more extreme test statistic
+    dof = len(real_mass[:, 2]) # Degrees of freedom
+    P_1 = 1 - chi2.cdf(chi2_1, dof) # P-value for background 1
+    P_2 = 1 - chi2.cdf(chi2_2, dof) # P-value for background 2
+
+    # **Perform pseudoexperiments by generating simulated data based on the Poisson distribution
+    # with means given by the simulated mass data for backgrounds 1 and 2**
+    pseudo_1 = pseudo_experiments(mc1_mass[:, 2], k) # For background 1
+    pseudo_2 = pseudo_experiments(mc2_mass[:, 2], k) # For background 2
+
+    # Chi-square values are calculated for the pseudoexperiments
+    chi2_1_pseudo = chi_square(pseudo_1, mc1_mass[:, 2])
+    chi2_2_pseudo = chi_square(pseudo_2, mc2_mass[:, 2])
+
+    # Calculate P-values using pseudoexperiments
+    P_1_pseudo = np.sum(chi2_1_pseudo > chi2_1) / k
+    P_2_pseudo = np.sum(chi2_2_pseudo > chi2_2) / k
+
+    # Find optimal value of parameter 'a'
+    best_a, chi2_min = best_combination(real_mass, mc1_mass, mc2_mass)
+    best_combo = best_a * mc1_mass + (1 - best_a) * mc2_mass # Combination of backgrounds 1 and 2 that best models the real data based on 'a'
+    P_theor = 1 - chi2.cdf(chi2_min, dof) # Theoretical p-value calculated using the minchi2 value
+
+    # Doing the same thing but for pseudoexperimental data
+    chi2_combo = chi_square(pseudo_experiments(best_combo[:, 2], k), best_combo[:, 2])
+    P_combo = np.sum(chi2_combo > chi2_min) / k
+
+    results = {
+        "chi2_1": chi2_1, "chi2_2": chi2_2, "P_1": P_1, "P_2": P_2,
+        "P_1_pseudo": P_1_pseudo, "P_2_pseudo": P_2_pseudo,
+        "best_a": best_a, "chi2_min": chi2_min, "P_theor": P_theor, "P_combo": P_combo
+    }
+    arrays = {"dof": dof, "chi2_1_pseudo": chi2_1_pseudo, "chi2_2_pseudo": chi2_2_pseudo, "best_combo": best_combo}
+    return {name: float(value) for name, value in results.items()}, arrays
+
+def plot_chi2_distributions(arrays):
+    """Plots the chi-square distributions of the pseudoexperiments against the theoretical one"""
+    import matplotlib.pyplot as plt
+    from scipy.stats import chi2
+
+    # Plotting the chi-square distributions with histograms
+    chi2_values = np.arange(0, 101, 1) # x-axis values 1-100
+    chi2_hist_p1, _ = np.histogram(arrays["chi2_1_pseudo"], bins=chi2_values, density=True) # y-axis values
+    chi2_hist_p2, _ = np.histogram(arrays["chi2_2_pseudo"], bins=chi2_values, density=True) # y-axis values
+
+    # Plotting the first figure against backgrounds 1 and 2
+    plt.plot(chi2_values, chi2.pdf(chi2_values, arrays["dof"]), 'g', label='Theoretical')
+    plt.plot(chi2_values[:100], chi2_hist_p1, 'r', label='Pseudo - Bkg 1')
+    plt.plot(chi2_values[:100], chi2_hist_p2, 'b', label='Pseudo - Bkg 2')
+    plt.legend()
+    plt.xlabel('$\\chi^{2}$ values')
+    plt.ylabel('Probability')
+    plt.title('Real data vs. Backgrounds 1 & 2')
+
+def plot_best_combination(real_mass, arrays):
+    """Plots the real data against the best combination of the backgrounds"""
+    import matplotlib.pyplot as plt
+
+    # Plotting the second figure with the combined background
+    plt.plot(arrays["best_combo"][:, 0], arrays["best_combo"][:, 2], '-b', label='Combination of bkg')
+    plt.plot(real_mass[:, 0], real_mass[:, 2], '-g', label='Data')
+    plt.legend()
+    plt.xlabel('Mass')
+    plt.ylabel('Probability')
+    plt.title('Real data vs. Optimal/Combined background')
+
+def main(argv=None):
+    """Runs the tests and prints the results; --output-dir saves the figures there instead of showing them,
+    --no-plot skips them and --json writes the numeric results"""
+    parser = argparse.ArgumentParser(description="Test how well two simulated backgrounds model the real data with Pearson's chi-squared test.")
+    parser.add_argument("--pseudoexperiments", type=int, default=10000, help="number of pseudoexperiments per test")
+    parser.add_argument("--seed", type=int, help="seed for np.random")
+    parser.add_argument("--output-dir", help="save the figures as Figure_1.png and Figure_2.png in this directory instead of showing them")
+    parser.add_argument("--no-plot", action="store_true", help="don't make the figures")
+    parser.add_argument("--json", help="write the results to this file (- for stdout)")
+    parser.add_argument("--quiet", action="store_true", help="don't print the results")
+    args = parser.parse_args(argv)
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    def show(name):
+        """Saves the figure just made as name in --output-dir, or shows it"""
+        import matplotlib.pyplot as plt
+        if args.output_dir:
+            plt.savefig(os.path.join(args.output_dir, name))
+            plt.close()
+        else:
+            plt.show()
+
+    real_mass, mc1_mass, mc2_mass = load_data()
+    results, arrays = analyze(real_mass, mc1_mass, mc2_mass, args.pseudoexperiments, args.seed)
+
+    if not args.quiet:
+        print(f"\nThe chi^2 values for MC1 and MC2 are {results['chi2_1']:.2f} and {results['chi2_2']:.2f}, respectively.")
+        print(f"\nThe P-values for backgrounds 1 and 2 are P1 = {results['P_1']:.0f} and P2 = {results['P_2']:.3f}.")
+        print(f"\nThe P-values for pseudoexperiments with backgrounds 1 and 2 are P1 = {results['P_1_pseudo']:.3f} and P2 = {results['P_2_pseudo']:.3f}.")
+    if not args.no_plot:
+        plot_chi2_distributions(arrays)
+        show("Figure_1.png")
+
+    if not args.quiet:
+        print(f"\nCombining backgrounds 1 and 2 to best model the real data:")
+        print(f"Value of 'a' that best combines the backgrounds: a = {results['best_a']:.3f}")
+        print(f"Minimum chi-square value obtained while finding 'a': {results['chi2_min']:.2f}")
+        print(f"P-value based on the chi-square value: P = {results['P_theor']:.3f}")
+        print(f"P-value for pseudoexperiments: P = {results['P_combo']:.3f}\n")
+    if not args.no_plot:
+        plot_best_combination(real_mass, arrays)
+        show("Figure_2.png")
+
+    if args.json == "-":
+        print(json.dumps(results, indent=2))
+    elif args.json:
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=2)
+    return results
+
+if __name__ == "__main__":
+    main()